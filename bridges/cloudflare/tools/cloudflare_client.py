@@ -34,13 +34,19 @@ Environment variables (set in docker-compose.yml or .env):
   CLOUDFLARE_API_TOKEN    - Scoped API token (Edit access)
   CLOUDFLARE_ACCOUNT_ID   - Account identifier
   CLOUDFLARE_DOMAIN       - Default zone domain (optional, default: example.com)
+  CLOUDFLARE_MAX_CONCURRENCY - In-flight request cap per client (optional, default: 16)
 """
 
 import os
 import sys
 import json
 import time
+import random
+import hashlib
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 try:
@@ -50,11 +56,96 @@ try:
 except ImportError:
     pass
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 API_TOKEN = os.getenv("CLOUDFLARE_API_TOKEN", "")
 ACCOUNT_ID = os.getenv("CLOUDFLARE_ACCOUNT_ID", "")
 
 API_BASE = "https://api.cloudflare.com/client/v4"
 
+# Upper bound on concurrent requests when fanning out independent calls
+# (remaining pages in get_all, parallel probes in test_connection).
+MAX_WORKERS = 8
+
+# Every call goes to api.cloudflare.com, so one host pool sized above
+# MAX_WORKERS keeps concurrent requests on warm keep-alive connections.
+# requests speaks HTTP/1.1 only, so each in-flight request holds its own
+# connection: callers that fan out (dns_audit ZONE_WORKERS, tunnel_map
+# TUNNEL_WORKERS) must stay at or below POOL_MAXSIZE, or surplus
+# connections are discarded and re-handshaken on the next burst.
+POOL_CONNECTIONS = 32
+POOL_MAXSIZE = 64
+
+# Fan-out stages nest (sections -> apps -> pages), so the worker counts alone
+# do not bound load on the API. Each client lets at most this many requests
+# be in flight at once; the rest queue locally instead of tripping
+# Cloudflare's per-account rate limiting.
+MAX_CONCURRENCY = int(os.getenv("CLOUDFLARE_MAX_CONCURRENCY", "16"))
+
+# Retry policy for 429s, transient 5xx responses, and connection errors:
+# exponential backoff with full jitter, never shorter than Retry-After.
+MAX_RETRIES = 5
+BACKOFF_BASE = 1
+BACKOFF_CAP = 30
+# 5xx responses and connection errors are only retried for idempotent
+# methods so a POST that reached the origin is never replayed.
+# 524 is Cloudflare's origin timeout, which the API can return under load.
+RETRY_STATUSES = {500, 502, 503, 504, 524}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "PUT", "DELETE"}
+
+# Opt-in GET response cache (get(..., cache=True)). Fresh entries are served
+# locally; stale entries are revalidated with If-None-Match when Cloudflare
+# supplied an ETag. Any write through this client clears the cache.
+CACHE_TTL = 300
+CACHE_MAXSIZE = 512
+
+# Page size for DNS record listings (the endpoint allows up to 5,000,000;
+# most other list endpoints cap per_page at 50-1000).
+DNS_PER_PAGE = 5000
+
+# Successful token verifications, shared by every client in the process and
+# keyed by a hash of the token. Dropped on any 401/403 from the API.
+VERIFY_TTL = 3600
+_VERIFY_CACHE = {}
+
+
+def parse_json(resp: requests.Response):
+    """Decode a response body, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(resp.content)
+    return resp.json()
+
+
+def dump_json(obj) -> str:
+    """Serialize obj as indented JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2, default=str).decode()
+    return json.dumps(obj, indent=2, default=str)
+
+
+def write_json(obj, out) -> None:
+    """Write obj as indented JSON plus a trailing newline to a text stream.
+
+    The stdlib encoder streams chunks to out; orjson encodes in one C call
+    and its bytes go straight to out.buffer when the stream has one.
+    """
+    if orjson is None:
+        json.dump(obj, out, indent=2, default=str)
+        out.write("\n")
+        return
+    data = orjson.dumps(
+        obj, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE, default=str
+    )
+    buffer = getattr(out, "buffer", None)
+    if buffer is None:
+        out.write(data.decode())
+    else:
+        out.flush()
+        buffer.write(data)
+
 
 class CloudflareClient:
     """Cloudflare REST API v4 client with pagination and rate-limit handling."""
@@ -82,11 +173,35 @@ class CloudflareClient:
             sys.exit(1)
 
         self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=POOL_CONNECTIONS,
+            pool_maxsize=max(POOL_MAXSIZE, MAX_CONCURRENCY),
+            max_retries=0,
+        )
+        self.session.mount("https://", adapter)
+        self.session.headers.update(self._auth_headers())
+        self._random = random.SystemRandom()
+        self._slots = threading.BoundedSemaphore(MAX_CONCURRENCY)
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+        self._zone_ids = {}
+        self._token_key = hashlib.blake2b(
+            self.api_token.encode(), digest_size=16
+        ).hexdigest()
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
 
     # ── Auth Headers ────────────────────────────────────────────────────
 
     def _auth_headers(self) -> dict:
-        """Return headers with Bearer token."""
+        """Return headers with Bearer token (installed on the session once)."""
         return {
             "Authorization": f"Bearer {self.api_token}",
             "Content-Type": "application/json",
@@ -97,41 +212,116 @@ class CloudflareClient:
     def _request(
         self, method: str, endpoint: str, **kwargs
     ) -> requests.Response:
-        """Make an API request with auth, rate-limit retry."""
+        """Make an API request with auth, rate-limit and transient-error retry."""
         url = endpoint if endpoint.startswith("http") else f"{API_BASE}/{endpoint.lstrip('/')}"
-        max_retries = 3
-
-        for attempt in range(max_retries):
-            kwargs["headers"] = self._auth_headers()
-            resp = self.session.request(method, url, timeout=60, **kwargs)
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+
+        # Auth headers live on the session; requests merges any per-call
+        # headers (e.g. If-None-Match) on top of them.
+        for attempt in range(MAX_RETRIES):
+            try:
+                # Slot is held for the request only, never across a backoff.
+                with self._slots:
+                    resp = self.session.request(method, url, timeout=60, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if not idempotent or attempt == MAX_RETRIES - 1:
+                    raise
+                delay = self._backoff(attempt)
+                print(f"  {type(e).__name__}. Retrying in {delay:.1f}s...", file=sys.stderr)
+                time.sleep(delay)
+                continue
 
-            if resp.status_code == 429:
-                retry_after = int(resp.headers.get("Retry-After", 5))
-                print(f"  Rate limited. Waiting {retry_after}s...", file=sys.stderr)
-                time.sleep(retry_after)
+            retryable = resp.status_code == 429 or (
+                idempotent and resp.status_code in RETRY_STATUSES
+            )
+            if retryable and attempt < MAX_RETRIES - 1:
+                delay = self._backoff(attempt, resp.headers.get("Retry-After"))
+                if resp.status_code == 429:
+                    print(f"  Rate limited. Waiting {delay:.1f}s...", file=sys.stderr)
+                else:
+                    print(f"  HTTP {resp.status_code}. Retrying in {delay:.1f}s...", file=sys.stderr)
+                time.sleep(delay)
                 continue
 
+            if resp.status_code in (401, 403):
+                _VERIFY_CACHE.pop(self._token_key, None)
             return resp
 
-        return resp
+    def _backoff(self, attempt: int, retry_after: str = None) -> float:
+        """Full-jitter backoff delay, floored at the server's Retry-After."""
+        delay = self._random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+        if retry_after:
+            try:
+                delay = max(delay, float(retry_after))
+            except ValueError:
+                pass
+        return delay
+
+    def get(
+        self,
+        endpoint: str,
+        params: dict = None,
+        cache: bool = False,
+        headers: dict = None,
+    ) -> requests.Response:
+        if not cache:
+            return self._request("GET", endpoint, params=params, headers=headers)
 
-    def get(self, endpoint: str, params: dict = None) -> requests.Response:
-        return self._request("GET", endpoint, params=params)
+        key = (
+            endpoint,
+            tuple(sorted((params or {}).items())),
+            tuple(sorted((headers or {}).items())),
+        )
+        cached = self._cache.get(key)
+        now = time.monotonic()
+        if cached and now - cached[0] < CACHE_TTL:
+            return cached[2]
+
+        if cached and cached[1]:
+            headers = {**(headers or {}), "If-None-Match": cached[1]}
+        resp = self._request("GET", endpoint, params=params, headers=headers)
+
+        if resp.status_code == 304 and cached:
+            self._cache[key] = (now, cached[1], cached[2])
+            return cached[2]
+        if resp.status_code == 200:
+            with self._cache_lock:
+                if key not in self._cache and len(self._cache) >= CACHE_MAXSIZE:
+                    self._cache.pop(next(iter(self._cache)))
+                self._cache[key] = (now, resp.headers.get("ETag"), resp)
+        return resp
 
     def post(self, endpoint: str, json_data: dict = None) -> requests.Response:
+        self._cache.clear()
         return self._request("POST", endpoint, json=json_data)
 
     def patch(self, endpoint: str, json_data: dict = None) -> requests.Response:
+        self._cache.clear()
         return self._request("PATCH", endpoint, json=json_data)
 
     def put(self, endpoint: str, json_data: dict = None) -> requests.Response:
+        self._cache.clear()
         return self._request("PUT", endpoint, json=json_data)
 
     def delete(self, endpoint: str, params: dict = None) -> requests.Response:
+        self._cache.clear()
         return self._request("DELETE", endpoint, params=params)
 
     # ── Pagination Helper ───────────────────────────────────────────────
 
+    def _fetch_page(self, endpoint: str, params: dict, cache: bool = False):
+        """Fetch a single page of a list endpoint. Returns None on error."""
+        resp = self.get(endpoint, params=params, cache=cache)
+
+        if resp.status_code != 200:
+            print(
+                f"  Error fetching {endpoint}: {resp.status_code} {resp.text[:200]}",
+                file=sys.stderr,
+            )
+            return None
+
+        return parse_json(resp)
+
     def get_all(
         self,
         endpoint: str,
@@ -139,105 +329,210 @@ class CloudflareClient:
         params: dict = None,
         per_page: int = 50,
         max_pages: int = 100,
+        cache: bool = False,
     ) -> list:
         """
         Paginate through all results for a list endpoint.
 
         Cloudflare uses page/per_page pagination with result_info metadata.
         `key` is the JSON key containing the array (usually 'result').
+
+        Page 1 is fetched first to learn total_pages; any remaining pages are
+        then fetched concurrently and appended in page order. Endpoints that
+        return result_info.cursors are followed cursor by cursor instead.
+        Pass cache=True for reference data that is safe to reuse within the
+        process.
         """
         params = dict(params or {})
         params["per_page"] = per_page
-        results = []
+        params["page"] = 1
+
+        data = self._fetch_page(endpoint, params, cache)
+        if data is None:
+            return []
+
+        results = list(data.get(key, []))
+        result_info = data.get("result_info") or {}
+        if not results:
+            return results
+        if "cursors" in result_info:
+            results.extend(
+                self._iter_cursor(endpoint, key, params, result_info, max_pages, cache)
+            )
+            return results
 
-        for page_num in range(1, max_pages + 1):
-            params["page"] = page_num
-            resp = self.get(endpoint, params=params)
+        total_pages = min(result_info.get("total_pages") or 1, max_pages)
+        if total_pages <= 1:
+            return results
 
-            if resp.status_code != 200:
-                print(
-                    f"  Error fetching {endpoint}: {resp.status_code} {resp.text[:200]}",
-                    file=sys.stderr,
-                )
-                break
+        pages = [{**params, "page": n} for n in range(2, total_pages + 1)]
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(pages))) as pool:
+            for page in pool.map(lambda p: self._fetch_page(endpoint, p, cache), pages):
+                if page is None:
+                    break
+                results.extend(page.get(key, []))
 
-            data = resp.json()
-            items = data.get(key, [])
-            results.extend(items)
+        return results
 
-            result_info = data.get("result_info", {})
-            total_pages = result_info.get("total_pages", 1)
-            if page_num >= total_pages:
-                break
+    def iter_all(
+        self,
+        endpoint: str,
+        key: str = "result",
+        params: dict = None,
+        per_page: int = 50,
+        max_pages: int = 100,
+    ):
+        """
+        Yield items from a list endpoint one page at a time.
 
-        return results
+        Unlike get_all, pages are fetched lazily and sequentially, so only
+        one page is held in memory and callers can process items as they
+        arrive. Prefer get_all when the whole result set is needed at once.
+        """
+        params = dict(params or {})
+        params["per_page"] = per_page
+
+        for page_num in range(1, max_pages + 1):
+            params["page"] = page_num
+            data = self._fetch_page(endpoint, params)
+            if data is None:
+                return
+
+            items = data.get(key, [])
+            if not items:
+                return
+            yield from items
+
+            result_info = data.get("result_info") or {}
+            if "cursors" in result_info:
+                yield from self._iter_cursor(endpoint, key, params, result_info, max_pages)
+                return
+            if page_num >= (result_info.get("total_pages") or 1):
+                return
+
+    def _iter_cursor(
+        self,
+        endpoint: str,
+        key: str,
+        params: dict,
+        result_info: dict,
+        max_pages: int,
+        cache: bool = False,
+    ):
+        """Yield items from the pages after the first of a cursor endpoint."""
+        params = {k: v for k, v in params.items() if k != "page"}
+
+        for _ in range(max_pages - 1):
+            cursor = (result_info.get("cursors") or {}).get("after")
+            if not cursor:
+                return
+            params["cursor"] = cursor
+            data = self._fetch_page(endpoint, dict(params), cache)
+            if data is None:
+                return
+            items = data.get(key, [])
+            if not items:
+                return
+            yield from items
+            result_info = data.get("result_info") or {}
 
     # ── Token Verification ──────────────────────────────────────────────
 
     def verify_token(self) -> dict:
-        """Verify the API token is valid and active."""
+        """Verify the API token is valid and active (cached per process)."""
+        cached = _VERIFY_CACHE.get(self._token_key)
+        if cached and time.monotonic() - cached[0] < VERIFY_TTL:
+            return dict(cached[1])
+
         resp = self.get("user/tokens/verify")
         if resp.status_code == 200:
-            data = resp.json()
-            return {"ok": True, **data.get("result", {})}
+            data = parse_json(resp)
+            result = {"ok": True, **data.get("result", {})}
+            _VERIFY_CACHE[self._token_key] = (time.monotonic(), result)
+            return dict(result)
         return {"ok": False, "status": resp.status_code, "error": resp.text[:200]}
 
     # ── Zones ───────────────────────────────────────────────────────────
 
     def list_zones(self, name: str = None) -> list:
         """List all zones. Optionally filter by domain name."""
-        params = {}
         if name:
-            params["name"] = name
-        return self.get_all("zones", params=params)
+            # Zone names are unique, so an exact-name filter matches at most
+            # one zone; 5 is the smallest page size /zones accepts.
+            return self.get_all(
+                "zones", params={"name": name}, per_page=5, max_pages=1, cache=True
+            )
+        return self.get_all("zones", cache=True)
 
     def get_zone(self, zone_id: str) -> dict:
         """Get a single zone by ID."""
-        resp = self.get(f"zones/{zone_id}")
+        resp = self.get(f"zones/{zone_id}", cache=True)
         resp.raise_for_status()
-        return resp.json().get("result", {})
+        return parse_json(resp).get("result", {})
 
     def find_zone_id(self, domain: str = None) -> str:
-        """Find the zone ID for a domain name."""
+        """Find the zone ID for a domain name (memoized per client)."""
         domain = domain or os.environ.get("CLOUDFLARE_DOMAIN", "example.com")
-        zones = self.list_zones(name=domain)
-        for z in zones:
-            if z.get("name") == domain:
-                return z["id"]
-        return ""
+        if domain not in self._zone_ids:
+            zones = self.list_zones(name=domain)
+            zone_id = next((z["id"] for z in zones if z.get("name") == domain), "")
+            if not zone_id:
+                return ""
+            self._zone_ids[domain] = zone_id
+        return self._zone_ids[domain]
 
     # ── DNS Records ─────────────────────────────────────────────────────
 
-    def list_dns_records(
-        self, zone_id: str, record_type: str = None, name: str = None
-    ) -> list:
-        """List DNS records for a zone. Optionally filter by type or name."""
+    @staticmethod
+    def _dns_record_params(record_type: str = None, name: str = None) -> dict:
         params = {}
         if record_type:
             params["type"] = record_type
         if name:
             params["name"] = name
-        return self.get_all(f"zones/{zone_id}/dns_records", params=params)
+        return params
+
+    def list_dns_records(
+        self, zone_id: str, record_type: str = None, name: str = None
+    ) -> list:
+        """List DNS records for a zone. Optionally filter by type or name."""
+        # The DNS records endpoint accepts far larger pages than the
+        # 50-per-page default, so most zones come back in one request.
+        return self.get_all(
+            f"zones/{zone_id}/dns_records",
+            params=self._dns_record_params(record_type, name),
+            per_page=DNS_PER_PAGE,
+        )
+
+    def iter_dns_records(
+        self, zone_id: str, record_type: str = None, name: str = None
+    ):
+        """Yield DNS records for a zone page by page (see iter_all)."""
+        return self.iter_all(
+            f"zones/{zone_id}/dns_records",
+            params=self._dns_record_params(record_type, name),
+            per_page=DNS_PER_PAGE,
+        )
 
     def get_dns_record(self, zone_id: str, record_id: str) -> dict:
         """Get a single DNS record."""
         resp = self.get(f"zones/{zone_id}/dns_records/{record_id}")
         resp.raise_for_status()
-        return resp.json().get("result", {})
+        return parse_json(resp).get("result", {})
 
     # ── SSL/TLS ─────────────────────────────────────────────────────────
 
     def get_ssl_settings(self, zone_id: str) -> dict:
         """Get SSL/TLS mode for a zone (off, flexible, full, strict)."""
-        resp = self.get(f"zones/{zone_id}/settings/ssl")
+        resp = self.get(f"zones/{zone_id}/settings/ssl", cache=True)
         resp.raise_for_status()
-        return resp.json().get("result", {})
+        return parse_json(resp).get("result", {})
 
     def get_ssl_verification(self, zone_id: str) -> list:
         """Get SSL certificate verification status."""
         resp = self.get(f"zones/{zone_id}/ssl/verification")
         if resp.status_code == 200:
-            return resp.json().get("result", [])
+            return parse_json(resp).get("result", [])
         return []
 
     def list_certificates(self, zone_id: str) -> list:
@@ -246,9 +541,9 @@ class CloudflareClient:
 
     def get_tls_settings(self, zone_id: str) -> dict:
         """Get TLS version settings (min TLS version)."""
-        resp = self.get(f"zones/{zone_id}/settings/min_tls_version")
+        resp = self.get(f"zones/{zone_id}/settings/min_tls_version", cache=True)
         resp.raise_for_status()
-        return resp.json().get("result", {})
+        return parse_json(resp).get("result", {})
 
     # ── Page Rules ──────────────────────────────────────────────────────
 
@@ -270,15 +565,15 @@ class CloudflareClient:
 
     def get_cache_level(self, zone_id: str) -> dict:
         """Get cache level setting for a zone."""
-        resp = self.get(f"zones/{zone_id}/settings/cache_level")
+        resp = self.get(f"zones/{zone_id}/settings/cache_level", cache=True)
         resp.raise_for_status()
-        return resp.json().get("result", {})
+        return parse_json(resp).get("result", {})
 
     def get_browser_cache_ttl(self, zone_id: str) -> dict:
         """Get browser cache TTL setting for a zone."""
-        resp = self.get(f"zones/{zone_id}/settings/browser_cache_ttl")
+        resp = self.get(f"zones/{zone_id}/settings/browser_cache_ttl", cache=True)
         resp.raise_for_status()
-        return resp.json().get("result", {})
+        return parse_json(resp).get("result", {})
 
     # ── Cloudflare Tunnels ──────────────────────────────────────────────
 
@@ -293,7 +588,7 @@ class CloudflareClient:
         """Get a single tunnel by ID."""
         resp = self.get(f"accounts/{self.account_id}/cfd_tunnel/{tunnel_id}")
         resp.raise_for_status()
-        return resp.json().get("result", {})
+        return parse_json(resp).get("result", {})
 
     def get_tunnel_configurations(self, tunnel_id: str) -> dict:
         """Get the configuration (ingress rules) for a tunnel."""
@@ -301,7 +596,7 @@ class CloudflareClient:
             f"accounts/{self.account_id}/cfd_tunnel/{tunnel_id}/configurations"
         )
         resp.raise_for_status()
-        return resp.json().get("result", {})
+        return parse_json(resp).get("result", {})
 
     def list_tunnel_connections(self, tunnel_id: str) -> list:
         """List active connections for a tunnel."""
@@ -309,7 +604,7 @@ class CloudflareClient:
             f"accounts/{self.account_id}/cfd_tunnel/{tunnel_id}/connections"
         )
         if resp.status_code == 200:
-            return resp.json().get("result", [])
+            return parse_json(resp).get("result", [])
         return []
 
     def list_tunnel_routes(self) -> list:
@@ -326,7 +621,7 @@ class CloudflareClient:
         """Get a single Access Application."""
         resp = self.get(f"accounts/{self.account_id}/access/apps/{app_id}")
         resp.raise_for_status()
-        return resp.json().get("result", {})
+        return parse_json(resp).get("result", {})
 
     def list_access_policies(self, app_id: str) -> list:
         """List policies for an Access Application."""
@@ -338,7 +633,7 @@ class CloudflareClient:
 
     def list_access_groups(self) -> list:
         """List Access Groups."""
-        return self.get_all(f"accounts/{self.account_id}/access/groups")
+        return self.get_all(f"accounts/{self.account_id}/access/groups", cache=True)
 
     def get_access_group(self, group_id: str) -> dict:
         """Get a single Access Group."""
@@ -346,7 +641,7 @@ class CloudflareClient:
             f"accounts/{self.account_id}/access/groups/{group_id}"
         )
         resp.raise_for_status()
-        return resp.json().get("result", {})
+        return parse_json(resp).get("result", {})
 
     # ── Zero Trust: Service Tokens ──────────────────────────────────────
 
@@ -361,7 +656,7 @@ class CloudflareClient:
     def list_identity_providers(self) -> list:
         """List configured identity providers (IdPs) for Access."""
         return self.get_all(
-            f"accounts/{self.account_id}/access/identity_providers"
+            f"accounts/{self.account_id}/access/identity_providers", cache=True
         )
 
     # ── Zero Trust: Gateway ─────────────────────────────────────────────
@@ -370,28 +665,28 @@ class CloudflareClient:
         """List Zero Trust Gateway filtering rules."""
         resp = self.get(f"accounts/{self.account_id}/gateway/rules")
         if resp.status_code == 200:
-            return resp.json().get("result", [])
+            return parse_json(resp).get("result", [])
         return []
 
     def list_gateway_locations(self) -> list:
         """List Gateway locations (DNS endpoints)."""
         resp = self.get(f"accounts/{self.account_id}/gateway/locations")
         if resp.status_code == 200:
-            return resp.json().get("result", [])
+            return parse_json(resp).get("result", [])
         return []
 
     def list_gateway_categories(self) -> list:
         """List Gateway content categories."""
-        resp = self.get(f"accounts/{self.account_id}/gateway/categories")
+        resp = self.get(f"accounts/{self.account_id}/gateway/categories", cache=True)
         if resp.status_code == 200:
-            return resp.json().get("result", [])
+            return parse_json(resp).get("result", [])
         return []
 
     def get_gateway_configuration(self) -> dict:
         """Get the Zero Trust Gateway account configuration."""
         resp = self.get(f"accounts/{self.account_id}/gateway/configuration")
         if resp.status_code == 200:
-            return resp.json().get("result", {})
+            return parse_json(resp).get("result", {})
         return {}
 
     # ── Email Routing ───────────────────────────────────────────────────
@@ -400,7 +695,7 @@ class CloudflareClient:
         """Get email routing settings for a zone."""
         resp = self.get(f"zones/{zone_id}/email/routing")
         if resp.status_code == 200:
-            return resp.json().get("result", {})
+            return parse_json(resp).get("result", {})
         return {}
 
     def list_email_routing_rules(self, zone_id: str) -> list:
@@ -411,7 +706,7 @@ class CloudflareClient:
         """
         resp = self.get(f"zones/{zone_id}/email/routing/rules")
         if resp.status_code == 200:
-            return resp.json().get("result", [])
+            return parse_json(resp).get("result", [])
         return []
 
     def list_email_routing_addresses(self, zone_id: str) -> list:
@@ -422,16 +717,16 @@ class CloudflareClient:
         """
         resp = self.get(f"zones/{zone_id}/email/routing/addresses")
         if resp.status_code == 200:
-            return resp.json().get("result", [])
+            return parse_json(resp).get("result", [])
         return []
 
     # ── Account ─────────────────────────────────────────────────────────
 
     def get_account(self) -> dict:
         """Get the account details."""
-        resp = self.get(f"accounts/{self.account_id}")
+        resp = self.get(f"accounts/{self.account_id}", cache=True)
         resp.raise_for_status()
-        return resp.json().get("result", {})
+        return parse_json(resp).get("result", {})
 
     def list_account_members(self) -> list:
         """List account members."""
@@ -443,7 +738,7 @@ class CloudflareClient:
         """List all settings for a zone."""
         resp = self.get(f"zones/{zone_id}/settings")
         if resp.status_code == 200:
-            return resp.json().get("result", [])
+            return parse_json(resp).get("result", [])
         return []
 
     # ── Utility ─────────────────────────────────────────────────────────
@@ -451,13 +746,19 @@ class CloudflareClient:
     def test_connection(self) -> dict:
         """Health check: validate token and basic API access."""
         try:
-            verify = self.verify_token()
-            if not verify.get("ok"):
-                return verify
+            # Token verification and the zone listing are independent, so
+            # overlap the two round-trips instead of paying for them serially.
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                verify_future = pool.submit(self.verify_token)
+                zones_future = pool.submit(self.list_zones)
+
+                verify = verify_future.result()
+                if not verify.get("ok"):
+                    return verify
+                zones = zones_future.result()
 
             result = {"ok": True, "token_status": verify.get("status", "active")}
 
-            zones = self.list_zones()
             result["zone_count"] = len(zones)
             result["zones"] = [
                 {"name": z["name"], "status": z.get("status")} for z in zones
@@ -484,54 +785,98 @@ class CloudflareClient:
 
 # ── CLI Entrypoint ─────────────────────────────────────────────────────
 # Quick testing: python3 cloudflare_client.py test
+# Several actions on one client: printf 'zones\ndns\n' | python3 cloudflare_client.py --batch
+
+
+def _cmd_test(client: CloudflareClient, args: list) -> None:
+    print(dump_json(client.test_connection()))
+
+
+def _cmd_zones(client: CloudflareClient, args: list) -> None:
+    zones = client.list_zones()
+    print(f"Total zones: {len(zones)}")
+    for z in zones:
+        print(f"  {z['name']:40s}  {z.get('status', '?'):10s}  plan={z.get('plan', {}).get('name', '?')}")
+
+
+def _cmd_dns(client: CloudflareClient, args: list) -> None:
+    zone_id = args[0] if args else client.find_zone_id()
+    if not zone_id:
+        print("ERROR: Could not find zone ID. Pass zone_id as argument or set domain.", file=sys.stderr)
+        sys.exit(1)
+    records = client.list_dns_records(zone_id)
+    print(f"Total DNS records: {len(records)}")
+    from collections import Counter
+    by_type = Counter(r.get("type", "?") for r in records)
+    for rtype, count in by_type.most_common():
+        print(f"  {rtype:10s}  {count}")
+
+
+def _cmd_tunnels(client: CloudflareClient, args: list) -> None:
+    tunnels = client.list_tunnels()
+    print(f"Total tunnels: {len(tunnels)}")
+    for t in tunnels:
+        status = t.get("status", "?")
+        print(f"  {t.get('name', '?'):40s}  {status:12s}  id={t['id'][:12]}")
+
+
+def _cmd_access_apps(client: CloudflareClient, args: list) -> None:
+    apps = client.list_access_apps()
+    print(f"Total Access Applications: {len(apps)}")
+    for a in apps:
+        print(f"  {a.get('name', '?'):40s}  type={a.get('type', '?'):20s}  domain={a.get('domain', '?')}")
+
+
+def _cmd_service_tokens(client: CloudflareClient, args: list) -> None:
+    tokens = client.list_service_tokens()
+    print(f"Total Service Tokens: {len(tokens)}")
+    for t in tokens:
+        expires = t.get("expires_at", "never")
+        print(f"  {t.get('name', '?'):40s}  expires={expires}")
+
+
+HANDLERS = {
+    "test": _cmd_test,
+    "zones": _cmd_zones,
+    "dns": _cmd_dns,
+    "tunnels": _cmd_tunnels,
+    "access-apps": _cmd_access_apps,
+    "service-tokens": _cmd_service_tokens,
+}
+
+
+def _run(client: CloudflareClient, action: str, args: list) -> None:
+    handler = HANDLERS.get(action)
+    if handler is None:
+        print(f"Unknown action: {action}", file=sys.stderr)
+        print(f"Usage: python3 cloudflare_client.py [{'|'.join(HANDLERS)}|--batch]", file=sys.stderr)
+        sys.exit(1)
+    handler(client, args)
+
 
 if __name__ == "__main__":
     action = sys.argv[1] if len(sys.argv) > 1 else "test"
     client = CloudflareClient()
 
-    if action == "test":
-        result = client.test_connection()
-        print(json.dumps(result, indent=2))
-
-    elif action == "zones":
-        zones = client.list_zones()
-        print(f"Total zones: {len(zones)}")
-        for z in zones:
-            print(f"  {z['name']:40s}  {z.get('status', '?'):10s}  plan={z.get('plan', {}).get('name', '?')}")
-
-    elif action == "dns":
-        zone_id = sys.argv[2] if len(sys.argv) > 2 else client.find_zone_id()
-        if not zone_id:
-            print("ERROR: Could not find zone ID. Pass zone_id as argument or set domain.", file=sys.stderr)
+    if action == "--batch":
+        # One action per line; the client (and its response cache) is shared.
+        # A failing line is reported and the batch carries on; the exit
+        # status is non-zero if any line failed.
+        import shlex
+        failed = 0
+        for lineno, line in enumerate(sys.stdin, 1):
+            try:
+                argv = shlex.split(line)
+                if argv:
+                    _run(client, argv[0], argv[1:])
+            except SystemExit as e:
+                if e.code:
+                    failed += 1
+                    print(f"ERROR: batch line {lineno} failed: {line.strip()}", file=sys.stderr)
+            except Exception as e:
+                failed += 1
+                print(f"ERROR: batch line {lineno} failed: {line.strip()}: {e}", file=sys.stderr)
+        if failed:
             sys.exit(1)
-        records = client.list_dns_records(zone_id)
-        print(f"Total DNS records: {len(records)}")
-        from collections import Counter
-        by_type = Counter(r.get("type", "?") for r in records)
-        for rtype, count in by_type.most_common():
-            print(f"  {rtype:10s}  {count}")
-
-    elif action == "tunnels":
-        tunnels = client.list_tunnels()
-        print(f"Total tunnels: {len(tunnels)}")
-        for t in tunnels:
-            status = t.get("status", "?")
-            print(f"  {t.get('name', '?'):40s}  {status:12s}  id={t['id'][:12]}")
-
-    elif action == "access-apps":
-        apps = client.list_access_apps()
-        print(f"Total Access Applications: {len(apps)}")
-        for a in apps:
-            print(f"  {a.get('name', '?'):40s}  type={a.get('type', '?'):20s}  domain={a.get('domain', '?')}")
-
-    elif action == "service-tokens":
-        tokens = client.list_service_tokens()
-        print(f"Total Service Tokens: {len(tokens)}")
-        for t in tokens:
-            expires = t.get("expires_at", "never")
-            print(f"  {t.get('name', '?'):40s}  expires={expires}")
-
     else:
-        print(f"Unknown action: {action}")
-        print("Usage: python3 cloudflare_client.py [test|zones|dns|tunnels|access-apps|service-tokens]")
-        sys.exit(1)
+        _run(client, action, sys.argv[2:])
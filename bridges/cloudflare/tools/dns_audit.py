@@ -32,32 +32,66 @@ Usage:
     python3 dns_audit.py --table             # Human-readable table
     python3 dns_audit.py --csv               # CSV export
     python3 dns_audit.py --zone <zone_id>    # Target specific zone by ID
+    python3 dns_audit.py --zones <id1>,<id2> # Audit several zones concurrently
     python3 dns_audit.py --type CNAME        # Filter by record type
 """
 
 import sys
 import os
-import json
 import csv
 import io
+import ipaddress
+import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parent))
-from cloudflare_client import CloudflareClient
+from cloudflare_client import CloudflareClient, dump_json
 
+# Zones audited concurrently by audit_many (kept under the client's pool size)
+ZONE_WORKERS = 16
+
+_TUNNEL_SUFFIX = ".cfargotunnel.com"
+_UUID_RE = re.compile(
+    r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.IGNORECASE
+)
+
+# Address ranges that should never be published as DNS-only A records
+# (RFC 1918, loopback, link-local).
+_PRIVATE_NETS = [
+    ipaddress.ip_network(n)
+    for n in ("10.0.0.0/8", "172.16.0.0/12", "192.168.0.0/16", "127.0.0.0/8", "169.254.0.0/16")
+]
+
+
+def _is_private_ip(content: str) -> bool:
+    """Return True if content is an IPv4 address in a private range."""
+    try:
+        ip = ipaddress.ip_address(content)
+    except ValueError:
+        return False
+    return any(ip in net for net in _PRIVATE_NETS)
 
-def classify_record(record: dict) -> str:
-    """Classify a DNS record as tunnel-backed, proxied, or DNS-only."""
-    rtype = record.get("type", "")
-    content = record.get("content", "")
-    proxied = record.get("proxied", False)
 
-    if rtype == "CNAME" and ".cfargotunnel.com" in content:
+_record_sort_key = itemgetter("name", "type")
+_issue_sort_key = itemgetter("record", "type")
+
+
+def _classify(rtype: str, content: str, proxied: bool) -> str:
+    if rtype == "CNAME" and content.endswith(_TUNNEL_SUFFIX):
         return "tunnel"
-    elif proxied:
-        return "proxied"
-    else:
-        return "dns-only"
+    return "proxied" if proxied else "dns-only"
+
+
+def classify_record(record: dict) -> str:
+    """Classify a DNS record as tunnel-backed, proxied, or DNS-only."""
+    return _classify(
+        record.get("type", ""),
+        record.get("content", ""),
+        record.get("proxied", False),
+    )
 
 
 def audit_dns(client: CloudflareClient, zone_id: str, record_type: str = None) -> dict:
@@ -70,78 +104,69 @@ def audit_dns(client: CloudflareClient, zone_id: str, record_type: str = None) -
       - tunnel_records: Records backed by Cloudflare Tunnels
       - potential_issues: Records that may need attention
     """
-    records = client.list_dns_records(zone_id, record_type=record_type)
+    records = client.iter_dns_records(zone_id, record_type=record_type)
 
     classified = []
+    tunnel_records = []
+    private_ip_issues = []
+    tunnel_uuid_issues = []
+    by_type = Counter()
+    by_class = Counter()
+    proxied_count = 0
+
+    # Classify and summarize in a single pass as records stream in
     for r in records:
-        classification = classify_record(r)
-        classified.append({
+        rtype = r.get("type", "")
+        content = r.get("content", "")
+        proxied = r.get("proxied", False)
+        classification = _classify(rtype, content, proxied)
+        c = {
             "name": r.get("name", ""),
-            "type": r.get("type", ""),
-            "content": r.get("content", ""),
-            "proxied": r.get("proxied", False),
+            "type": rtype,
+            "content": content,
+            "proxied": proxied,
             "ttl": r.get("ttl", 0),
             "classification": classification,
             "id": r.get("id", ""),
             "created_on": r.get("created_on", ""),
             "modified_on": r.get("modified_on", ""),
             "comment": r.get("comment", ""),
-        })
-
-    # Sort by name then type
-    classified.sort(key=lambda r: (r["name"], r["type"]))
-
-    # Build summary
-    from collections import Counter
-    by_type = Counter(r["type"] for r in classified)
-    by_class = Counter(r["classification"] for r in classified)
-    proxied_count = sum(1 for r in classified if r["proxied"])
-
-    # Identify tunnel-backed records
-    tunnel_records = [r for r in classified if r["classification"] == "tunnel"]
-
-    # Identify potential issues
-    issues = []
-
-    # DNS-only A records pointing to private IPs (should be tunnel-backed)
-    for r in classified:
-        if r["type"] == "A" and r["classification"] == "dns-only":
-            content = r["content"]
-            if (content.startswith("10.") or
-                content.startswith("192.168.") or
-                content.startswith("172.16.") or
-                content.startswith("172.17.") or
-                content.startswith("172.18.") or
-                content.startswith("172.19.") or
-                content.startswith("172.2") or
-                content.startswith("172.3")):
-                issues.append({
-                    "record": r["name"],
-                    "type": r["type"],
-                    "content": r["content"],
-                    "issue": "DNS-only A record pointing to private IP",
-                    "suggestion": "Consider using a Cloudflare Tunnel instead",
-                })
-
-    # CNAME records pointing to non-existent tunnel UUIDs
-    for r in classified:
-        if r["classification"] == "tunnel":
-            tunnel_uuid = r["content"].replace(".cfargotunnel.com", "")
-            if len(tunnel_uuid) != 36:
-                issues.append({
-                    "record": r["name"],
-                    "type": r["type"],
-                    "content": r["content"],
+        }
+        classified.append(c)
+
+        by_type[rtype] += 1
+        by_class[classification] += 1
+        if proxied:
+            proxied_count += 1
+
+        if classification == "tunnel":
+            tunnel_records.append(c)
+            # CNAME records pointing to non-existent tunnel UUIDs
+            tunnel_uuid = content[:-len(_TUNNEL_SUFFIX)]
+            if not _UUID_RE.match(tunnel_uuid):
+                tunnel_uuid_issues.append({
+                    "record": c["name"],
+                    "type": c["type"],
+                    "content": c["content"],
                     "issue": "Tunnel CNAME with unusual UUID format",
                     "suggestion": "Verify tunnel exists and is active",
                 })
+        elif rtype == "A" and classification == "dns-only" and _is_private_ip(content):
+            # DNS-only A records pointing to private IPs (should be tunnel-backed)
+            private_ip_issues.append({
+                "record": c["name"],
+                "type": c["type"],
+                "content": c["content"],
+                "issue": "DNS-only A record pointing to private IP",
+                "suggestion": "Consider using a Cloudflare Tunnel instead",
+            })
 
-    # MX records that might conflict with email routing
-    mx_records = [r for r in classified if r["type"] == "MX"]
-    if mx_records:
-        for mx in mx_records:
-            if "route" in mx["content"].lower() or "cloudflare" not in mx["content"].lower():
-                pass  # Normal MX records
+    # Sort by name then type
+    classified.sort(key=_record_sort_key)
+    tunnel_records.sort(key=_record_sort_key)
+    private_ip_issues.sort(key=_issue_sort_key)
+    tunnel_uuid_issues.sort(key=_issue_sort_key)
+    issues = private_ip_issues + tunnel_uuid_issues
 
     return {
         "zone_id": zone_id,
@@ -158,8 +183,20 @@ def audit_dns(client: CloudflareClient, zone_id: str, record_type: str = None) -
     }
 
 
-def format_table(report: dict) -> str:
-    """Format audit report as a human-readable table."""
+def audit_many(client: CloudflareClient, zone_ids: list, record_type: str = None) -> dict:
+    """Audit several zones concurrently. Returns {zone_id: report}."""
+    if not zone_ids:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(ZONE_WORKERS, len(zone_ids))) as pool:
+        reports = pool.map(lambda z: audit_dns(client, z, record_type=record_type), zone_ids)
+        return dict(zip(zone_ids, reports))
+
+
+def _table_lines(report: dict) -> list:
+    """Build the human-readable table as a list of lines."""
+    records = report["records"]
+    name_w = max(45, max((len(r["name"]) for r in records), default=45))
+
     lines = []
     lines.append("=" * 120)
     lines.append("Cloudflare DNS Audit")
@@ -187,12 +224,12 @@ def format_table(report: dict) -> str:
         lines.append("-" * 120)
         lines.append("Tunnel-Backed Records")
         lines.append("-" * 120)
-        header = f"{'FQDN':<45s}  {'Tunnel UUID':<38s}  {'Proxied'}"
+        header = f"{'FQDN'.ljust(name_w)}  {'Tunnel UUID':<38s}  {'Proxied'}"
         lines.append(header)
         for r in report["tunnel_records"]:
-            tunnel_uuid = r["content"].replace(".cfargotunnel.com", "")
+            tunnel_uuid = r["content"][:-len(_TUNNEL_SUFFIX)]
             proxied = "yes" if r["proxied"] else "no"
-            lines.append(f"{r['name']:<45s}  {tunnel_uuid:<38s}  {proxied}")
+            lines.append(f"{r['name'].ljust(name_w)}  {tunnel_uuid.ljust(38)}  {proxied}")
         lines.append("")
 
     # Issues
@@ -211,48 +248,58 @@ def format_table(report: dict) -> str:
     lines.append("-" * 120)
     lines.append("All Records")
     lines.append("-" * 120)
-    header = f"{'Name':<45s}  {'Type':<8s}  {'Content':<45s}  {'Class':<10s}  {'Proxied'}"
+    header = f"{'Name'.ljust(name_w)}  {'Type':<8s}  {'Content':<45s}  {'Class':<10s}  {'Proxied'}"
     lines.append(header)
     lines.append("-" * 120)
-    for r in report["records"]:
-        content = r["content"][:45]
-        proxied = "yes" if r["proxied"] else "no"
-        lines.append(
-            f"{r['name']:<45s}  {r['type']:<8s}  {content:<45s}  {r['classification']:<10s}  {proxied}"
-        )
+    lines.extend(
+        f"{r['name'].ljust(name_w)}  {r['type'].ljust(8)}  {r['content'][:45].ljust(45)}  "
+        f"{r['classification'].ljust(10)}  {'yes' if r['proxied'] else 'no'}"
+        for r in records
+    )
+
+    return lines
+
+
+def format_table(report: dict) -> str:
+    """Format audit report as a human-readable table."""
+    return "\n".join(_table_lines(report))
 
-    return "\n".join(lines)
+
+def write_table(report: dict, out) -> None:
+    """Write the human-readable table to a file-like object."""
+    out.writelines(line + "\n" for line in _table_lines(report))
+
+
+CSV_FIELDS = (
+    "name", "type", "content", "proxied", "ttl",
+    "classification", "comment", "created_on", "modified_on",
+)
+
+
+def write_csv(report: dict, out) -> None:
+    """Write audit records as CSV to a file-like object."""
+    writer = csv.writer(out, lineterminator="\n")
+    writer.writerow(CSV_FIELDS)
+    writer.writerows(
+        (
+            r["name"], r["type"], r["content"], r["proxied"], r["ttl"],
+            r["classification"], r["comment"], r["created_on"], r["modified_on"],
+        )
+        for r in report["records"]
+    )
 
 
 def format_csv(report: dict) -> str:
     """Format audit records as CSV."""
     output = io.StringIO()
-    writer = csv.DictWriter(
-        output,
-        fieldnames=[
-            "name", "type", "content", "proxied", "ttl",
-            "classification", "comment", "created_on", "modified_on",
-        ],
-    )
-    writer.writeheader()
-    for r in report["records"]:
-        writer.writerow({
-            "name": r["name"],
-            "type": r["type"],
-            "content": r["content"],
-            "proxied": r["proxied"],
-            "ttl": r["ttl"],
-            "classification": r["classification"],
-            "comment": r["comment"],
-            "created_on": r["created_on"],
-            "modified_on": r["modified_on"],
-        })
+    write_csv(report, output)
     return output.getvalue()
 
 
 def main():
     output_format = "json"
     zone_id = None
+    zone_ids = []
     record_type = None
 
     args = sys.argv[1:]
@@ -267,6 +314,9 @@ def main():
         elif args[i] == "--zone" and i + 1 < len(args):
             i += 1
             zone_id = args[i]
+        elif args[i] == "--zones" and i + 1 < len(args):
+            i += 1
+            zone_ids = [z.strip() for z in args[i].split(",") if z.strip()]
         elif args[i] == "--type" and i + 1 < len(args):
             i += 1
             record_type = args[i]
@@ -274,6 +324,21 @@ def main():
 
     client = CloudflareClient()
 
+    if zone_ids:
+        reports = audit_many(client, zone_ids, record_type=record_type)
+        if output_format == "table":
+            for report in reports.values():
+                write_table(report, sys.stdout)
+                sys.stdout.write("\n")
+        elif output_format == "csv":
+            write_csv(
+                {"records": [r for report in reports.values() for r in report["records"]]},
+                sys.stdout,
+            )
+        else:
+            print(dump_json(reports))
+        return
+
     # Resolve zone ID if not provided
     if not zone_id:
         default_domain = os.environ.get("CLOUDFLARE_DOMAIN", "example.com")
@@ -286,11 +351,11 @@ def main():
     report = audit_dns(client, zone_id, record_type=record_type)
 
     if output_format == "table":
-        print(format_table(report))
+        write_table(report, sys.stdout)
     elif output_format == "csv":
-        print(format_csv(report))
+        write_csv(report, sys.stdout)
     else:
-        print(json.dumps(report, indent=2, default=str))
+        print(dump_json(report))
 
 
 if __name__ == "__main__":
@@ -36,21 +36,30 @@ Environment variables:
   CLOUDFLARE_OPERATOR_TOKEN  - Operator's personal token with API Tokens: Edit (User scope)
   CLOUDFLARE_API_TOKEN       - Shared bridge token (read-only, for reference)
   CLOUDFLARE_ACCOUNT_ID      - Account identifier
+  CLOUDFLARE_CACHE_DIR       - Short-lived response cache (default: /opt/bridge/data/cache)
 """
 
 import os
 import sys
+import copy
 import json
+import time
+import hashlib
 import argparse
-import requests
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-try:
-    from dotenv import load_dotenv
-    _env_path = Path(__file__).resolve().parents[1] / ".env"
-    load_dotenv(_env_path)
-except ImportError:
-    pass
+# requests/urllib3 are imported in TokenManager.__init__, so --help and
+# argument errors never pay for them. .env is only read when something is
+# actually missing from the environment.
+if not all(os.getenv(k) for k in ("CLOUDFLARE_OPERATOR_TOKEN", "CLOUDFLARE_API_TOKEN", "CLOUDFLARE_ACCOUNT_ID")):
+    try:
+        from dotenv import load_dotenv
+        _env_path = Path(__file__).resolve().parents[1] / ".env"
+        load_dotenv(_env_path)
+    except ImportError:
+        pass
 
 API_BASE = "https://api.cloudflare.com/client/v4"
 
@@ -58,12 +67,36 @@ OPERATOR_TOKEN = os.getenv("CLOUDFLARE_OPERATOR_TOKEN", "")
 BRIDGE_TOKEN = os.getenv("CLOUDFLARE_API_TOKEN", "")
 ACCOUNT_ID = os.getenv("CLOUDFLARE_ACCOUNT_ID", "")
 
+# The permission-group catalog is global and rarely changes, so it is kept
+# on disk briefly to spare back-to-back CLI runs the full fetch.
+CACHE_DIR = Path(os.getenv("CLOUDFLARE_CACHE_DIR", "/opt/bridge/data/cache"))
+PERM_GROUPS_CACHE = CACHE_DIR / "cf_perm_groups.json"
+PERM_GROUPS_TTL = 300
+# The bridge token's id, remembered so audit can fetch it alongside verify.
+BRIDGE_ID_CACHE = CACHE_DIR / "cf_bridge_token_id.json"
+
+# Connection pool and retry policy for the operator session. POST is left
+# out of the retried methods: a replayed token create would mint a duplicate.
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 32
+RETRY_OPTIONS = {
+    "total": 5,
+    "backoff_factor": 0.3,
+    "status_forcelist": (429, 500, 502, 503, 504),
+    "allowed_methods": frozenset(("GET", "PUT", "DELETE")),
+    "respect_retry_after_header": True,
+    "raise_on_status": False,
+}
+
 
 class TokenManager:
     """Manage Cloudflare API tokens via the /user/tokens API."""
 
-    def __init__(self, operator_token: str = None):
+    def __init__(self, operator_token: str = None, use_cache: bool = True):
         self.token = operator_token or OPERATOR_TOKEN
+        self.use_cache = use_cache
+        self._perm_groups = None
+        self._token_cache = {}
         if not self.token:
             print(
                 "ERROR: Missing operator token.\n"
@@ -78,22 +111,31 @@ class TokenManager:
             )
             sys.exit(1)
 
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
         self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(
+            pool_connections=POOL_CONNECTIONS,
+            pool_maxsize=POOL_MAXSIZE,
+            max_retries=Retry(**RETRY_OPTIONS),
+        ))
         self.session.headers.update({
             "Authorization": f"Bearer {self.token}",
             "Content-Type": "application/json",
         })
 
-    def _get(self, endpoint: str, params: dict = None) -> requests.Response:
+    def _get(self, endpoint: str, params: dict = None) -> "requests.Response":
         return self.session.get(f"{API_BASE}/{endpoint}", params=params, timeout=30)
 
-    def _put(self, endpoint: str, data: dict) -> requests.Response:
+    def _put(self, endpoint: str, data: dict) -> "requests.Response":
         return self.session.put(f"{API_BASE}/{endpoint}", json=data, timeout=30)
 
-    def _post(self, endpoint: str, data: dict) -> requests.Response:
+    def _post(self, endpoint: str, data: dict) -> "requests.Response":
         return self.session.post(f"{API_BASE}/{endpoint}", json=data, timeout=30)
 
-    def _delete(self, endpoint: str) -> requests.Response:
+    def _delete(self, endpoint: str) -> "requests.Response":
         return self.session.delete(f"{API_BASE}/{endpoint}", timeout=30)
 
     # ── Token Operations ────────────────────────────────────────────────
@@ -105,6 +147,48 @@ class TokenManager:
             return resp.json().get("result", {})
         return {"error": f"HTTP {resp.status_code}", "detail": resp.text[:200]}
 
+    def verify_bridge_token(self) -> dict:
+        """Verify the shared bridge token (CLOUDFLARE_API_TOKEN).
+
+        Sent over the operator session with a one-off Authorization header so
+        the call reuses the already-open connection to api.cloudflare.com.
+        """
+        if not BRIDGE_TOKEN:
+            return {}
+        resp = self.session.get(
+            f"{API_BASE}/user/tokens/verify",
+            headers={"Authorization": f"Bearer {BRIDGE_TOKEN}"},
+            timeout=15,
+        )
+        if resp.status_code == 200:
+            return resp.json().get("result", {})
+        return {}
+
+    @staticmethod
+    def _bridge_token_key() -> str:
+        return hashlib.blake2b(BRIDGE_TOKEN.encode(), digest_size=16).hexdigest()
+
+    def cached_bridge_token_id(self) -> str:
+        """Return the bridge token id recorded by a previous run, if any."""
+        if not (self.use_cache and BRIDGE_TOKEN):
+            return ""
+        try:
+            cached = json.loads(BRIDGE_ID_CACHE.read_text())
+        except (OSError, ValueError):
+            return ""
+        if cached.get("key") != self._bridge_token_key():
+            return ""
+        return cached.get("id", "")
+
+    def remember_bridge_token_id(self, token_id: str) -> None:
+        if not self.use_cache:
+            return
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            BRIDGE_ID_CACHE.write_text(json.dumps({"key": self._bridge_token_key(), "id": token_id}))
+        except OSError:
+            pass
+
     def list_tokens(self) -> list:
         """List all API tokens for the user."""
         resp = self._get("user/tokens")
@@ -117,86 +201,170 @@ class TokenManager:
         """Get a single token by ID."""
         resp = self._get(f"user/tokens/{token_id}")
         if resp.status_code == 200:
-            return resp.json().get("result", {})
+            token = resp.json().get("result", {})
+            self._token_cache[token_id] = token
+            return token
         return {}
 
     def list_permission_groups(self) -> list:
-        """List all available permission groups that can be granted."""
+        """List all available permission groups that can be granted.
+
+        Memoized per instance and, unless use_cache is False, cached on disk
+        for PERM_GROUPS_TTL seconds.
+        """
+        if self._perm_groups is not None:
+            return self._perm_groups
+
+        if self.use_cache:
+            groups = self._read_perm_groups_cache()
+            if groups is not None:
+                self._perm_groups = groups
+                return groups
+
         resp = self._get("user/tokens/permission_groups")
         if resp.status_code == 200:
-            return resp.json().get("result", [])
+            self._perm_groups = resp.json().get("result", [])
+            if self.use_cache:
+                self._write_perm_groups_cache(self._perm_groups)
+            return self._perm_groups
         print(f"Error listing permission groups: {resp.status_code} {resp.text[:200]}", file=sys.stderr)
         return []
 
+    @staticmethod
+    def _read_perm_groups_cache():
+        try:
+            cached = json.loads(PERM_GROUPS_CACHE.read_text())
+        except (OSError, ValueError):
+            return None
+        if time.time() - cached.get("ts", 0) > PERM_GROUPS_TTL:
+            return None
+        return cached.get("result")
+
+    @staticmethod
+    def _write_perm_groups_cache(groups: list) -> None:
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            PERM_GROUPS_CACHE.write_text(json.dumps({"ts": time.time(), "result": groups}))
+        except OSError:
+            pass
+
     def update_token(self, token_id: str, token_data: dict) -> dict:
         """Update a token's configuration (name, policies, status, etc.)."""
         resp = self._put(f"user/tokens/{token_id}", token_data)
         if resp.status_code == 200:
-            return resp.json().get("result", {})
+            token = resp.json().get("result", {})
+            self._token_cache[token_id] = token
+            return token
+        self._token_cache.pop(token_id, None)
         return {"error": f"HTTP {resp.status_code}", "detail": resp.text[:500]}
 
-    def add_permission_group(self, token_id: str, group_id: str, group_name: str = "") -> dict:
-        """Add a permission group to an existing token's first policy."""
-        token = self.get_token(token_id)
-        if not token:
-            return {"error": f"Token {token_id} not found"}
-
-        policies = token.get("policies", [])
-        if not policies:
-            return {"error": "Token has no policies"}
-
-        existing_ids = {pg["id"] for p in policies for pg in p.get("permission_groups", [])}
-        if group_id in existing_ids:
-            return {"error": f"Permission group {group_id} ({group_name}) already granted"}
-
-        policies[0]["permission_groups"].append({"id": group_id})
+    def _modify_policies(self, token_id: str, change) -> dict:
+        """Apply change(policies) to a token and PUT the result.
+
+        The token body from the last GET/PUT in this process is reused
+        instead of re-fetching. If the server rejects the write as stale
+        (409/412) the cache is dropped and the change is retried once
+        against a fresh GET. change() mutates the policy list in place and
+        returns an outcome dict, or one with "error" to abort the update.
+        """
+        for attempt in range(2):
+            token = self._token_cache.get(token_id) or self.get_token(token_id)
+            if not token:
+                return {"error": f"Token {token_id} not found"}
+            token = copy.deepcopy(token)
+
+            policies = token.get("policies", [])
+            outcome = change(policies)
+            if "error" in outcome:
+                return outcome
+
+            result = self.update_token(token_id, self._update_payload(token, policies))
+            if "error" not in result:
+                return outcome
+            if attempt or result["error"] not in ("HTTP 409", "HTTP 412"):
+                return result
+        return result
 
-        update_payload = {
+    @staticmethod
+    def _update_payload(token: dict, policies: list) -> dict:
+        """Build a PUT body that preserves the token's name, status and validity."""
+        payload = {
             "name": token.get("name"),
             "policies": policies,
             "status": token.get("status", "active"),
         }
         if token.get("not_before"):
-            update_payload["not_before"] = token["not_before"]
+            payload["not_before"] = token["not_before"]
         if token.get("expires_on"):
-            update_payload["expires_on"] = token["expires_on"]
+            payload["expires_on"] = token["expires_on"]
+        return payload
+
+    def add_permission_groups(self, token_id: str, group_ids: list, group_names: dict = None) -> dict:
+        """Add several permission groups to a token's first policy in one update.
+
+        Groups already on the first policy are skipped; grants held only by
+        other policies (which may be scoped to different resources) are not.
+        """
+        group_names = group_names or {}
+        requested = list(dict.fromkeys(group_ids))
+
+        def change(policies):
+            if not policies:
+                return {"error": "Token has no policies"}
+            # Only the first policy receives new groups, so only its grants
+            # count as already present.
+            target = policies[0].setdefault("permission_groups", [])
+            existing_ids = {pg["id"] for pg in target}
+            to_add = [gid for gid in requested if gid not in existing_ids]
+            if not to_add:
+                labels = ", ".join(f"{gid} ({group_names.get(gid, '')})" for gid in requested)
+                return {"error": f"Permission group {labels} already granted"}
+            target.extend({"id": gid} for gid in to_add)
+            return {
+                "success": True,
+                "added": [group_names.get(gid) or gid for gid in to_add],
+                "skipped": [gid for gid in requested if gid in existing_ids],
+            }
+
+        return self._modify_policies(token_id, change)
+
+    def remove_permission_groups(self, token_id: str, group_ids: list, group_names: dict = None) -> dict:
+        """Remove several permission groups from a token in one update."""
+        group_names = group_names or {}
+        requested = list(dict.fromkeys(group_ids))
+        remove_ids = set(requested)
+
+        def change(policies):
+            removed = set()
+            for policy in policies:
+                pgs = policy.get("permission_groups", [])
+                new_pgs = [pg for pg in pgs if pg["id"] not in remove_ids]
+                if len(new_pgs) < len(pgs):
+                    removed.update(pg["id"] for pg in pgs if pg["id"] in remove_ids)
+                    policy["permission_groups"] = new_pgs
+            if not removed:
+                labels = ", ".join(f"{gid} ({group_names.get(gid, '')})" for gid in requested)
+                return {"error": f"Permission group {labels} not found on token"}
+            return {
+                "success": True,
+                "removed": [group_names.get(gid) or gid for gid in requested if gid in removed],
+                "missing": [gid for gid in requested if gid not in removed],
+            }
+
+        return self._modify_policies(token_id, change)
 
-        result = self.update_token(token_id, update_payload)
+    def add_permission_group(self, token_id: str, group_id: str, group_name: str = "") -> dict:
+        """Add a permission group to an existing token's first policy."""
+        result = self.add_permission_groups(token_id, [group_id], {group_id: group_name})
         if "error" not in result:
-            return {"success": True, "added": group_name or group_id}
+            return {"success": True, "added": result["added"][0]}
         return result
 
     def remove_permission_group(self, token_id: str, group_id: str, group_name: str = "") -> dict:
         """Remove a permission group from an existing token."""
-        token = self.get_token(token_id)
-        if not token:
-            return {"error": f"Token {token_id} not found"}
-
-        policies = token.get("policies", [])
-        found = False
-        for policy in policies:
-            pgs = policy.get("permission_groups", [])
-            new_pgs = [pg for pg in pgs if pg["id"] != group_id]
-            if len(new_pgs) < len(pgs):
-                found = True
-                policy["permission_groups"] = new_pgs
-
-        if not found:
-            return {"error": f"Permission group {group_id} ({group_name}) not found on token"}
-
-        update_payload = {
-            "name": token.get("name"),
-            "policies": policies,
-            "status": token.get("status", "active"),
-        }
-        if token.get("not_before"):
-            update_payload["not_before"] = token["not_before"]
-        if token.get("expires_on"):
-            update_payload["expires_on"] = token["expires_on"]
-
-        result = self.update_token(token_id, update_payload)
+        result = self.remove_permission_groups(token_id, [group_id], {group_id: group_name})
         if "error" not in result:
-            return {"success": True, "removed": group_name or group_id}
+            return {"success": True, "removed": result["removed"][0]}
         return result
 
     def find_permission_group(self, name_substring: str) -> list:
@@ -250,7 +418,7 @@ def cmd_show_token(args, mgr):
         print(f"Policy {i+1} (effect={effect}):")
         print(f"  Resources: {json.dumps(resources)}")
         print(f"  Permission Groups ({len(pgs)}):")
-        for pg in sorted(pgs, key=lambda x: x.get("name", x.get("id", ""))):
+        for _, _, pg in sorted((pg.get("name") or pg.get("id", ""), i, pg) for i, pg in enumerate(pgs)):
             print(f"    - {pg.get('name', '(unnamed)'):<55} id={pg.get('id','')}")
 
 def cmd_list_permissions(args, mgr):
@@ -269,7 +437,7 @@ def cmd_list_permissions(args, mgr):
 
     for scope in sorted(scopes.keys()):
         print(f"\n  [{scope}]")
-        for g in sorted(scopes[scope], key=lambda x: x.get("name", "")):
+        for _, _, g in sorted((g.get("name", ""), i, g) for i, g in enumerate(scopes[scope])):
             print(f"    {g.get('name','?'):<55} {g.get('id','')}")
 
 def cmd_add_permission(args, mgr):
@@ -284,38 +452,47 @@ def cmd_add_permission(args, mgr):
         print(f"\nUse --group-id <id> to add a specific permission.")
         return
 
-    result = mgr.add_permission_group(args.token_id, args.group_id, args.search or "")
+    names = {args.group_id[0]: args.search} if len(args.group_id) == 1 and args.search else {}
+    result = mgr.add_permission_groups(args.token_id, args.group_id, names)
     if "error" in result:
         print(f"Error: {result['error']}")
         sys.exit(1)
-    print(f"Added permission group: {result.get('added')}")
+    for added in result["added"]:
+        print(f"Added permission group: {added}")
+    for skipped in result["skipped"]:
+        print(f"Already granted, skipped: {skipped}")
 
 def cmd_remove_permission(args, mgr):
-    result = mgr.remove_permission_group(args.token_id, args.group_id, "")
+    result = mgr.remove_permission_groups(args.token_id, args.group_id)
     if "error" in result:
         print(f"Error: {result['error']}")
         sys.exit(1)
-    print(f"Removed permission group: {result.get('removed')}")
+    for removed in result["removed"]:
+        print(f"Removed permission group: {removed}")
+    for missing in result["missing"]:
+        print(f"Not on token, skipped: {missing}")
 
 def cmd_audit(args, mgr):
     """Compare bridge token permissions against what's actually accessible."""
-    tokens = mgr.list_tokens()
-    bridge_token_id = None
-
-    # Find the bridge token by matching its ID from verify
-    bridge_headers = {"Authorization": f"Bearer {BRIDGE_TOKEN}", "Content-Type": "application/json"}
-    resp = requests.get(f"{API_BASE}/user/tokens/verify", headers=bridge_headers, timeout=15)
-    if resp.status_code == 200:
-        bridge_token_id = resp.json().get("result", {}).get("id")
+    # Verify identifies the bridge token. When a previous run recorded its
+    # id, fetch the token details at the same time instead of afterwards.
+    cached_id = mgr.cached_bridge_token_id()
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        verify = pool.submit(mgr.verify_bridge_token)
+        prefetch = pool.submit(mgr.get_token, cached_id) if cached_id else None
+        bridge_token_id = verify.result().get("id")
+        bridge_token = prefetch.result() if prefetch else {}
 
     if not bridge_token_id:
         print("Could not identify bridge token. Is CLOUDFLARE_API_TOKEN set?")
         sys.exit(1)
 
-    bridge_token = mgr.get_token(bridge_token_id)
+    if bridge_token.get("id") != bridge_token_id:
+        bridge_token = mgr.get_token(bridge_token_id)
     if not bridge_token:
         print(f"Could not fetch bridge token {bridge_token_id}")
         sys.exit(1)
+    mgr.remember_bridge_token_id(bridge_token_id)
 
     print(f"Bridge Token: {bridge_token.get('name')}")
     print(f"Token ID:     {bridge_token_id}")
@@ -327,12 +504,47 @@ def cmd_audit(args, mgr):
             current_groups[pg.get("id", "")] = pg.get("name", "(unnamed)")
 
     print(f"Current Permission Groups ({len(current_groups)}):")
-    for gid, gname in sorted(current_groups.items(), key=lambda x: x[1]):
+    for gid, gname in sorted(current_groups.items(), key=itemgetter(1)):
         print(f"  - {gname:<55} {gid}")
 
     print(f"\nBridge Token ID for programmatic updates: {bridge_token_id}")
 
 
+def _args_none(p):
+    pass
+
+def _args_list_tokens(p):
+    p.add_argument("--verbose", "-v", action="store_true", help="Show permission groups")
+
+def _args_show_token(p):
+    p.add_argument("token_id", help="Token ID")
+
+def _args_list_permissions(p):
+    p.add_argument("--search", "-s", help="Filter by name substring")
+    p.add_argument("--no-cache", action="store_true", help="Bypass the permission-group cache")
+
+def _args_add_permission(p):
+    p.add_argument("token_id", help="Token ID to modify")
+    p.add_argument("--group-id", action="append", help="Permission group ID to add (repeatable)")
+    p.add_argument("--search", "-s", help="Search for permission group by name")
+    p.add_argument("--no-cache", action="store_true", help="Bypass the permission-group cache")
+
+def _args_remove_permission(p):
+    p.add_argument("token_id", help="Token ID to modify")
+    p.add_argument("--group-id", action="append", required=True, help="Permission group ID to remove (repeatable)")
+
+
+SUBCOMMANDS = {
+    "verify": ("Verify operator token", _args_none),
+    "list-tokens": ("List all API tokens", _args_list_tokens),
+    "show-token": ("Show full token details", _args_show_token),
+    "list-permissions": ("List available permission groups", _args_list_permissions),
+    "add-permission": ("Add a permission group to a token", _args_add_permission),
+    "remove-permission": ("Remove a permission group from a token", _args_remove_permission),
+    "audit": ("Audit bridge token permissions", _args_none),
+}
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Cloudflare API Token Manager",
@@ -345,41 +557,29 @@ Examples:
   python3 token_manager.py show-token TOKEN_ID
   python3 token_manager.py list-permissions
   python3 token_manager.py list-permissions --search "firewall"
+  python3 token_manager.py list-permissions --no-cache
   python3 token_manager.py add-permission TOKEN_ID --search "Zone Settings" --group-id GROUP_ID
+  python3 token_manager.py add-permission TOKEN_ID --group-id GROUP_A --group-id GROUP_B
   python3 token_manager.py remove-permission TOKEN_ID --group-id GROUP_ID
   python3 token_manager.py audit
         """,
     )
     sub = parser.add_subparsers(dest="command")
 
-    sub.add_parser("verify", help="Verify operator token")
-
-    p_list = sub.add_parser("list-tokens", help="List all API tokens")
-    p_list.add_argument("--verbose", "-v", action="store_true", help="Show permission groups")
-
-    p_show = sub.add_parser("show-token", help="Show full token details")
-    p_show.add_argument("token_id", help="Token ID")
-
-    p_perms = sub.add_parser("list-permissions", help="List available permission groups")
-    p_perms.add_argument("--search", "-s", help="Filter by name substring")
-
-    p_add = sub.add_parser("add-permission", help="Add a permission group to a token")
-    p_add.add_argument("token_id", help="Token ID to modify")
-    p_add.add_argument("--group-id", help="Permission group ID to add")
-    p_add.add_argument("--search", "-s", help="Search for permission group by name")
-
-    p_rm = sub.add_parser("remove-permission", help="Remove a permission group from a token")
-    p_rm.add_argument("token_id", help="Token ID to modify")
-    p_rm.add_argument("--group-id", required=True, help="Permission group ID to remove")
-
-    sub.add_parser("audit", help="Audit bridge token permissions")
+    # Every command is registered so --help lists them all, but only the one
+    # being run gets its arguments built.
+    chosen = next((a for a in sys.argv[1:] if not a.startswith("-")), None)
+    for name, (help_text, add_arguments) in SUBCOMMANDS.items():
+        p = sub.add_parser(name, help=help_text)
+        if name == chosen:
+            add_arguments(p)
 
     args = parser.parse_args()
     if not args.command:
         parser.print_help()
         sys.exit(0)
 
-    mgr = TokenManager()
+    mgr = TokenManager(use_cache=not getattr(args, "no_cache", False))
 
     commands = {
         "verify": cmd_verify,
@@ -35,64 +35,147 @@ Usage:
     python3 zero_trust_audit.py --section apps       # Access apps only
     python3 zero_trust_audit.py --section tokens     # Service tokens only
     python3 zero_trust_audit.py --section gateway    # Gateway rules only
+    python3 zero_trust_audit.py --cache              # Reuse recent listings
+
+Everything is fetched live by default. With --cache, identity providers,
+Access groups and Gateway locations are reused from CLOUDFLARE_CACHE_DIR
+(default: /opt/bridge/data/cache) if fetched within the last
+CONFIG_CACHE_TTL seconds, so those sections can be up to 5 minutes old.
 """
 
+import os
 import sys
 import json
-from datetime import datetime, timezone
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from operator import itemgetter
 from pathlib import Path
 
+# cloudflare_client (and requests with it) is imported in main() once the
+# arguments have been checked
 sys.path.insert(0, str(Path(__file__).resolve().parent))
-from cloudflare_client import CloudflareClient
 
+# Access apps whose policies are fetched concurrently
+APP_WORKERS = 16
+
+# Slow-changing listings reused across back-to-back runs (opt-in: --cache)
+CACHE_DIR = Path(os.getenv("CLOUDFLARE_CACHE_DIR", "/opt/bridge/data/cache"))
+CONFIG_CACHE_TTL = 300
+
+
+def _cached_listing(client: "CloudflareClient", name: str, fetch, use_cache: bool) -> list:
+    """Return fetch(), reusing a copy on disk younger than CONFIG_CACHE_TTL."""
+    if not use_cache:
+        return fetch()
 
-def audit_access_apps(client: CloudflareClient) -> dict:
+    path = CACHE_DIR / f"cf_zt_{client.account_id}_{name}.json"
+    try:
+        if time.time() - path.stat().st_mtime < CONFIG_CACHE_TTL:
+            return json.loads(path.read_text())
+    except (OSError, ValueError):
+        pass
+
+    result = fetch()
+    if result:
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(result))
+        except OSError:
+            pass
+    return result
+
+
+# Access rule objects carry a single key naming the rule type. Policy and
+# group listings describe them slightly differently.
+_POLICY_INCLUDES = {
+    "email": lambda v: f"email:{v.get('email', '?')}",
+    "email_domain": lambda v: f"domain:{v.get('domain', '?')}",
+    "everyone": lambda v: "everyone",
+    "service_token": lambda v: "service_token",
+    "group": lambda v: f"group:{v.get('id', '?')[:8]}",
+    "any_valid_service_token": lambda v: "any_service_token",
+    "certificate": lambda v: "mtls_certificate",
+    "ip": lambda v: f"ip:{v.get('ip', '?')}",
+}
+_GROUP_INCLUDES = {
+    "email": _POLICY_INCLUDES["email"],
+    "email_domain": _POLICY_INCLUDES["email_domain"],
+    "everyone": _POLICY_INCLUDES["everyone"],
+    "ip": _POLICY_INCLUDES["ip"],
+    "group": lambda v: f"idp_group:{v.get('name', v.get('id', '?'))}",
+}
+
+
+def _describe_includes(includes: list, formatters: dict) -> list:
+    """Describe Access include rules, falling back to the raw rule keys."""
+    desc = []
+    for inc in includes:
+        kind = next(iter(inc), None)
+        fmt = formatters.get(kind)
+        desc.append(fmt(inc[kind]) if fmt else str(list(inc.keys())))
+    return desc
+
+
+def _expiry_sort_key(token: dict) -> int:
+    """Soonest expiry first; tokens without an expiry date sort last."""
+    days = token["days_until_expiry"]
+    return 99999 if days is None else days
+
+
+def _embedded_policies(app: dict):
+    """Return the policies embedded in an app listing, or None if absent.
+
+    Entries without include rules are only references and need a fetch.
+    """
+    policies = app.get("policies")
+    if not isinstance(policies, list):
+        return None
+    if any(not isinstance(p, dict) or "include" not in p for p in policies):
+        return None
+    return policies
+
+
+def _app_policies(client: "CloudflareClient", app_id: str) -> list:
+    try:
+        return client.list_access_policies(app_id)
+    except Exception:
+        return []
+
+
+def audit_access_apps(client: "CloudflareClient") -> dict:
     """Audit all Access Applications and their policies."""
     apps = client.list_access_apps()
+    if not apps:
+        return {"total_apps": 0, "apps": []}
     app_details = []
 
-    for app in apps:
+    # The app listing embeds each app's policies (rules included), so only
+    # apps without a usable embedded list need their own policies request.
+    all_policies = [_embedded_policies(app) for app in apps]
+    missing = [i for i, policies in enumerate(all_policies) if policies is None]
+    if missing:
+        with ThreadPoolExecutor(max_workers=min(APP_WORKERS, len(missing))) as pool:
+            fetched = pool.map(
+                lambda i: _app_policies(client, apps[i].get("id", "")), missing
+            )
+            for i, policies in zip(missing, fetched):
+                all_policies[i] = policies
+
+    for app, policies in zip(apps, all_policies):
         app_id = app.get("id", "")
         app_name = app.get("name", "unknown")
         app_type = app.get("type", "?")
         domain = app.get("domain", "")
         session_duration = app.get("session_duration", "")
 
-        # Fetch policies for this app
-        try:
-            policies = client.list_access_policies(app_id)
-        except Exception:
-            policies = []
-
         policy_summaries = []
         for p in policies:
-            includes = p.get("include", [])
-            include_desc = []
-            for inc in includes:
-                if "email" in inc:
-                    include_desc.append(f"email:{inc['email'].get('email', '?')}")
-                elif "email_domain" in inc:
-                    include_desc.append(f"domain:{inc['email_domain'].get('domain', '?')}")
-                elif "everyone" in inc:
-                    include_desc.append("everyone")
-                elif "service_token" in inc:
-                    include_desc.append("service_token")
-                elif "group" in inc:
-                    include_desc.append(f"group:{inc['group'].get('id', '?')[:8]}")
-                elif "any_valid_service_token" in inc:
-                    include_desc.append("any_service_token")
-                elif "certificate" in inc:
-                    include_desc.append("mtls_certificate")
-                elif "ip" in inc:
-                    include_desc.append(f"ip:{inc['ip'].get('ip', '?')}")
-                else:
-                    include_desc.append(str(list(inc.keys())))
-
             policy_summaries.append({
                 "name": p.get("name", "?"),
                 "decision": p.get("decision", "?"),
                 "precedence": p.get("precedence", 0),
-                "includes": include_desc,
+                "includes": _describe_includes(p.get("include", []), _POLICY_INCLUDES),
             })
 
         app_details.append({
@@ -107,20 +190,24 @@ def audit_access_apps(client: CloudflareClient) -> dict:
             "policy_count": len(policy_summaries),
         })
 
-    app_details.sort(key=lambda a: a["name"])
+    app_details.sort(key=itemgetter("name"))
     return {
         "total_apps": len(app_details),
         "apps": app_details,
     }
 
 
-def audit_service_tokens(client: CloudflareClient) -> dict:
+def audit_service_tokens(client: "CloudflareClient") -> dict:
     """Audit all Access Service Tokens with expiry analysis."""
     tokens = client.list_service_tokens()
+    if not tokens:
+        return {"total_tokens": 0, "expired": 0, "expiring_soon": 0, "tokens": []}
     now = datetime.now(timezone.utc)
+    expiry_warning = now + timedelta(days=30)
 
     token_details = []
-    expiring_soon = []
+    expired = 0
+    expiring_soon = 0
 
     for t in tokens:
         name = t.get("name", "unknown")
@@ -134,14 +221,15 @@ def audit_service_tokens(client: CloudflareClient) -> dict:
 
         if expires_at:
             try:
-                exp_dt = datetime.fromisoformat(expires_at.replace("Z", "+00:00"))
-                delta = exp_dt - now
-                days_until_expiry = delta.days
-                if days_until_expiry < 0:
+                # Python 3.11+ (the bridge base image) parses a trailing "Z".
+                exp_dt = datetime.fromisoformat(expires_at)
+                days_until_expiry = (exp_dt - now).days
+                if exp_dt < now:
                     status = "expired"
-                elif days_until_expiry < 30:
+                    expired += 1
+                elif exp_dt < expiry_warning:
                     status = "expiring_soon"
-                    expiring_soon.append(name)
+                    expiring_soon += 1
             except (ValueError, TypeError):
                 pass
 
@@ -155,19 +243,21 @@ def audit_service_tokens(client: CloudflareClient) -> dict:
             "updated_at": updated_at,
         })
 
-    token_details.sort(key=lambda t: t.get("days_until_expiry") or 99999)
+    token_details.sort(key=_expiry_sort_key)
 
     return {
         "total_tokens": len(token_details),
-        "expired": sum(1 for t in token_details if t["status"] == "expired"),
-        "expiring_soon": sum(1 for t in token_details if t["status"] == "expiring_soon"),
+        "expired": expired,
+        "expiring_soon": expiring_soon,
         "tokens": token_details,
     }
 
 
-def audit_identity_providers(client: CloudflareClient) -> dict:
+def audit_identity_providers(client: "CloudflareClient", use_cache: bool = False) -> dict:
     """Audit configured identity providers."""
-    idps = client.list_identity_providers()
+    idps = _cached_listing(client, "idps", client.list_identity_providers, use_cache)
+    if not idps:
+        return {"total_idps": 0, "idps": []}
 
     idp_details = []
     for idp in idps:
@@ -183,32 +273,18 @@ def audit_identity_providers(client: CloudflareClient) -> dict:
     }
 
 
-def audit_access_groups(client: CloudflareClient) -> dict:
+def audit_access_groups(client: "CloudflareClient", use_cache: bool = False) -> dict:
     """Audit Access Groups."""
-    groups = client.list_access_groups()
+    groups = _cached_listing(client, "groups", client.list_access_groups, use_cache)
+    if not groups:
+        return {"total_groups": 0, "groups": []}
 
     group_details = []
     for g in groups:
-        includes = g.get("include", [])
-        include_desc = []
-        for inc in includes:
-            if "email" in inc:
-                include_desc.append(f"email:{inc['email'].get('email', '?')}")
-            elif "email_domain" in inc:
-                include_desc.append(f"domain:{inc['email_domain'].get('domain', '?')}")
-            elif "everyone" in inc:
-                include_desc.append("everyone")
-            elif "ip" in inc:
-                include_desc.append(f"ip:{inc['ip'].get('ip', '?')}")
-            elif "group" in inc:
-                include_desc.append(f"idp_group:{inc['group'].get('name', inc['group'].get('id', '?'))}")
-            else:
-                include_desc.append(str(list(inc.keys())))
-
         group_details.append({
             "name": g.get("name", "unknown"),
             "id": g.get("id", "")[:12],
-            "includes": include_desc,
+            "includes": _describe_includes(g.get("include", []), _GROUP_INCLUDES),
             "created_at": g.get("created_at", ""),
             "updated_at": g.get("updated_at", ""),
         })
@@ -219,13 +295,27 @@ def audit_access_groups(client: CloudflareClient) -> dict:
     }
 
 
-def audit_gateway(client: CloudflareClient) -> dict:
+def audit_gateway(client: "CloudflareClient", use_cache: bool = False) -> dict:
     """Audit Zero Trust Gateway rules and locations."""
     rules = client.list_gateway_rules()
-    locations = client.list_gateway_locations()
+    locations = _cached_listing(
+        client, "locations", client.list_gateway_locations, use_cache
+    )
+    if not rules and not locations:
+        return {
+            "total_rules": 0,
+            "enabled_rules": 0,
+            "disabled_rules": 0,
+            "rules": [],
+            "total_locations": 0,
+            "locations": [],
+        }
 
     rule_details = []
+    enabled = 0
     for r in rules:
+        if r.get("enabled", False):
+            enabled += 1
         rule_details.append({
             "name": r.get("name", "unknown"),
             "action": r.get("action", "?"),
@@ -247,26 +337,34 @@ def audit_gateway(client: CloudflareClient) -> dict:
 
     return {
         "total_rules": len(rule_details),
-        "enabled_rules": sum(1 for r in rule_details if r["enabled"]),
-        "disabled_rules": sum(1 for r in rule_details if not r["enabled"]),
+        "enabled_rules": enabled,
+        "disabled_rules": len(rule_details) - enabled,
         "rules": rule_details,
         "total_locations": len(location_details),
         "locations": location_details,
     }
 
 
+_RULE = "=" * 100
+_DIVIDER = "─" * 100
+_TOKEN_ROW = "  {:<35s}  {:<15s}  {:<25s}  {}".format
+_IDP_ROW = "  {:<35s}  type={}".format
+_GROUP_ROW = "  {:<35s}  includes=[{}]".format
+_GATEWAY_ROW = "  {:<45s}  action={:<12s}  {}".format
+
+
 def format_table(report: dict) -> str:
     """Format audit report as a human-readable table."""
     lines = []
-    lines.append("=" * 100)
+    lines.append(_RULE)
     lines.append("Cloudflare Zero Trust Audit")
-    lines.append("=" * 100)
+    lines.append(_RULE)
 
     # Access Applications
     apps = report.get("access_apps", {})
-    lines.append(f"\n{'─' * 100}")
+    lines.append("\n" + _DIVIDER)
     lines.append(f"ACCESS APPLICATIONS ({apps.get('total_apps', 0)})")
-    lines.append(f"{'─' * 100}")
+    lines.append(_DIVIDER)
     for app in apps.get("apps", []):
         lines.append(f"\n  {app['name']}")
         lines.append(f"    Type: {app['type']}  |  Domain: {app['domain']}  |  Session: {app['session_duration']}")
@@ -276,46 +374,46 @@ def format_table(report: dict) -> str:
 
     # Service Tokens
     tokens = report.get("service_tokens", {})
-    lines.append(f"\n{'─' * 100}")
+    lines.append("\n" + _DIVIDER)
     lines.append(f"SERVICE TOKENS ({tokens.get('total_tokens', 0)})")
     if tokens.get("expired"):
         lines.append(f"  !! {tokens['expired']} expired token(s)")
     if tokens.get("expiring_soon"):
         lines.append(f"  !! {tokens['expiring_soon']} token(s) expiring within 30 days")
-    lines.append(f"{'─' * 100}")
-    header = f"  {'Name':<35s}  {'Status':<15s}  {'Expires':<25s}  {'Days Left'}"
-    lines.append(header)
-    for t in tokens.get("tokens", []):
-        days = str(t["days_until_expiry"]) if t["days_until_expiry"] is not None else "n/a"
-        lines.append(
-            f"  {t['name']:<35s}  {t['status']:<15s}  {t['expires_at']:<25s}  {days}"
-        )
+    lines.append(_DIVIDER)
+    lines.append(_TOKEN_ROW("Name", "Status", "Expires", "Days Left"))
+    lines.extend(
+        _TOKEN_ROW(t["name"], t["status"], t["expires_at"],
+                   str(t["days_until_expiry"]) if t["days_until_expiry"] is not None else "n/a")
+        for t in tokens.get("tokens", [])
+    )
 
     # Identity Providers
     idps = report.get("identity_providers", {})
-    lines.append(f"\n{'─' * 100}")
+    lines.append("\n" + _DIVIDER)
     lines.append(f"IDENTITY PROVIDERS ({idps.get('total_idps', 0)})")
-    lines.append(f"{'─' * 100}")
-    for idp in idps.get("idps", []):
-        lines.append(f"  {idp['name']:<35s}  type={idp['type']}")
+    lines.append(_DIVIDER)
+    lines.extend(_IDP_ROW(idp["name"], idp["type"]) for idp in idps.get("idps", []))
 
     # Access Groups
     groups = report.get("access_groups", {})
-    lines.append(f"\n{'─' * 100}")
+    lines.append("\n" + _DIVIDER)
     lines.append(f"ACCESS GROUPS ({groups.get('total_groups', 0)})")
-    lines.append(f"{'─' * 100}")
-    for g in groups.get("groups", []):
-        includes = ", ".join(g["includes"]) if g["includes"] else "none"
-        lines.append(f"  {g['name']:<35s}  includes=[{includes}]")
+    lines.append(_DIVIDER)
+    lines.extend(
+        _GROUP_ROW(g["name"], ", ".join(g["includes"]) if g["includes"] else "none")
+        for g in groups.get("groups", [])
+    )
 
     # Gateway
     gw = report.get("gateway", {})
-    lines.append(f"\n{'─' * 100}")
+    lines.append("\n" + _DIVIDER)
     lines.append(f"GATEWAY RULES ({gw.get('total_rules', 0)} total, {gw.get('enabled_rules', 0)} enabled)")
-    lines.append(f"{'─' * 100}")
-    for r in gw.get("rules", []):
-        status = "enabled" if r["enabled"] else "disabled"
-        lines.append(f"  {r['name']:<45s}  action={r['action']:<12s}  {status}")
+    lines.append(_DIVIDER)
+    lines.extend(
+        _GATEWAY_ROW(r["name"], r["action"], "enabled" if r["enabled"] else "disabled")
+        for r in gw.get("rules", [])
+    )
 
     if gw.get("locations"):
         lines.append(f"\n  Gateway Locations ({gw['total_locations']}):")
@@ -330,6 +428,7 @@ def format_table(report: dict) -> str:
 def main():
     output_format = "json"
     section = None
+    use_cache = False
 
     args = sys.argv[1:]
     i = 0
@@ -341,38 +440,50 @@ def main():
         elif args[i] == "--section" and i + 1 < len(args):
             i += 1
             section = args[i]
+        elif args[i] == "--cache":
+            use_cache = True
+        elif args[i] == "--no-cache":
+            use_cache = False
         i += 1
 
-    client = CloudflareClient()
-
-    report = {}
-
     sections_to_run = {
-        "apps": ("access_apps", lambda: audit_access_apps(client)),
-        "tokens": ("service_tokens", lambda: audit_service_tokens(client)),
-        "idps": ("identity_providers", lambda: audit_identity_providers(client)),
-        "groups": ("access_groups", lambda: audit_access_groups(client)),
-        "gateway": ("gateway", lambda: audit_gateway(client)),
+        "apps": ("access_apps", audit_access_apps),
+        "tokens": ("service_tokens", audit_service_tokens),
+        "idps": ("identity_providers", lambda c: audit_identity_providers(c, use_cache)),
+        "groups": ("access_groups", lambda c: audit_access_groups(c, use_cache)),
+        "gateway": ("gateway", lambda c: audit_gateway(c, use_cache)),
     }
 
-    if section:
-        if section not in sections_to_run:
-            print(f"ERROR: Unknown section '{section}'", file=sys.stderr)
-            print(f"Valid sections: {', '.join(sections_to_run.keys())}", file=sys.stderr)
-            sys.exit(1)
-        key, fn = sections_to_run[section]
-        report[key] = fn()
-    else:
-        for key, fn in sections_to_run.values():
-            try:
-                report[key] = fn()
-            except Exception as e:
-                report[key] = {"error": str(e)}
+    if section and section not in sections_to_run:
+        print(f"ERROR: Unknown section '{section}'", file=sys.stderr)
+        print(f"Valid sections: {', '.join(sections_to_run.keys())}", file=sys.stderr)
+        sys.exit(1)
+
+    from cloudflare_client import CloudflareClient, write_json
+
+    # One client (and one keep-alive pool) serves every section; the pooled
+    # connections are closed once the audit is done.
+    with CloudflareClient() as client:
+        report = {}
+
+        if section:
+            key, fn = sections_to_run[section]
+            report[key] = fn(client)
+        else:
+            # Sections are independent; run them side by side and collect the
+            # results in the usual order.
+            with ThreadPoolExecutor(max_workers=len(sections_to_run)) as pool:
+                futures = [(key, pool.submit(fn, client)) for key, fn in sections_to_run.values()]
+                for key, future in futures:
+                    try:
+                        report[key] = future.result()
+                    except Exception as e:
+                        report[key] = {"error": str(e)}
 
     if output_format == "table":
         print(format_table(report))
     else:
-        print(json.dumps(report, indent=2, default=str))
+        write_json(report, sys.stdout)
 
 
 if __name__ == "__main__":
@@ -28,11 +28,19 @@ import argparse
 import json
 import sys
 
-from ec_client import ECClient
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 def out(obj):
-    print(json.dumps(obj))
+    """Write one JSON document to stdout (orjson bytes when installed)."""
+    if orjson is None:
+        print(json.dumps(obj))
+        return
+    sys.stdout.flush()
+    sys.stdout.buffer.write(orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE))
 
 
 def die(msg):
@@ -40,202 +48,282 @@ def die(msg):
     sys.exit(1)
 
 
-def resp(data, *keys):
-    """Navigate into message_response and optional sub-keys."""
-    r = data.get("message_response", data)
-    for k in keys:
-        if isinstance(r, dict):
-            r = r.get(k, r)
-    return r
+def parse_ids(value):
+    """Parse a comma-separated ID list ("1, 2,3") into ints."""
+    try:
+        # int() ignores surrounding whitespace, so no per-item strip is needed
+        return list(map(int, value.split(",")))
+    except ValueError:
+        die(f"Invalid ID list {value!r}: expected comma-separated integers")
+
+
+def resp(data):
+    """Unwrap the message_response envelope, if present."""
+    return data.get("message_response", data)
 
 
 # ---------------------------------------------------------------------------
 # Server
 # ---------------------------------------------------------------------------
 
+def cmd_server_discover(args, client):
+    data = client.discover()
+    r = resp(data)
+    out({"success": True, "server": r})
+
+
+def cmd_server_properties(args, client):
+    data = client.server_properties()
+    r = data.get("message_response", data)
+    if isinstance(r, dict):
+        r = r.get("serverproperties", r)
+    props = r if isinstance(r, dict) else {}
+    out({"success": True, "domains": props.get("domains", []),
+         "custom_groups": props.get("customgroups", []),
+         "branch_offices": props.get("branchoffices", [])})
+
+
 def register_server(sub):
     p = sub.add_parser("server", help="Server info and properties")
     s = p.add_subparsers(dest="action", required=True)
-    s.add_parser("discover")
-    s.add_parser("properties")
+    s.add_parser("discover").set_defaults(func=cmd_server_discover)
+    s.add_parser("properties").set_defaults(func=cmd_server_properties)
 
 
-def run_server(args, client):
-    if args.action == "discover":
-        data = client.discover()
+# ---------------------------------------------------------------------------
+# Inventory
+# ---------------------------------------------------------------------------
+
+def cmd_inventory_summary(args, client):
+    data = client.inventory_summary()
+    out({"success": True, "summary": resp(data)})
+
+
+def cmd_inventory_computers(args, client):
+    filters = {}
+    if args.domainfilter:
+        filters["domainfilter"] = args.domainfilter
+    if args.branchofficefilter:
+        filters["branchofficefilter"] = args.branchofficefilter
+    if args.customgroupfilter:
+        filters["customgroupfilter"] = args.customgroupfilter
+    filters["pagelimit"] = args.limit
+    data = client.inventory_computers(**filters)
+    r = resp(data)
+    computers = r.get("computers", [])
+    total = r.get("total", len(computers))
+    result = [{
+        "resource_id": c.get("resource_id"),
+        "name": c.get("resource_name", c.get("full_name")),
+        "fqdn": c.get("fqdn_name"),
+        "domain": c.get("domain_netbios_name"),
+        "os": c.get("os_name", c.get("service_pack")),
+        "ip": c.get("ip_address"),
+        "mac": c.get("mac_address"),
+        "agent_version": c.get("agent_version"),
+        "live_status": c.get("computer_live_status"),
+        "branch_office": c.get("branch_office_name"),
+    } for c in computers]
+    out({"success": True, "total": total, "count": len(result), "computers": result})
+
+
+def cmd_inventory_software(args, client):
+    if args.search:
+        items = client.search(
+            "inventory/software", "software_name", "software_name", args.search, limit=args.limit
+        )
+        out({"success": True, "count": len(items), "software": items})
+    else:
+        data = client.inventory_software(pagelimit=args.limit)
         r = resp(data)
-        out({"success": True, "server": r})
+        sw = r.get("software", [])
+        out({"success": True, "total": r.get("total", len(sw)), "count": len(sw), "software": sw})
 
-    elif args.action == "properties":
-        data = client.server_properties()
-        r = resp(data, "serverproperties")
-        props = r if isinstance(r, dict) else {}
-        out({"success": True, "domains": props.get("domains", []),
-             "custom_groups": props.get("customgroups", []),
-             "branch_offices": props.get("branchoffices", [])})
 
+def cmd_inventory_hardware(args, client):
+    data = client.inventory_hardware(pagelimit=args.limit)
+    r = resp(data)
+    hw = r.get("hardware", [])
+    out({"success": True, "total": r.get("total", len(hw)), "count": len(hw), "hardware": hw})
+
+
+def cmd_inventory_computer_detail(args, client):
+    data = client.computer_detail(args.resource_id)
+    out({"success": True, "detail": resp(data)})
+
+
+def cmd_inventory_installed_software(args, client):
+    data = client.installed_software(args.resource_id)
+    r = resp(data)
+    sw = r.get("installedsoftware", r.get("installed_software", []))
+    if isinstance(sw, list):
+        out({"success": True, "count": len(sw), "software": sw})
+    else:
+        out({"success": True, "software": r})
+
+
+def cmd_inventory_software_computers(args, client):
+    data = client.software_computers(args.software_id)
+    r = resp(data)
+    comps = r.get("computers", [])
+    out({"success": True, "count": len(comps), "computers": comps})
+
+
+def cmd_inventory_metering(args, client):
+    data = client.metering_rules()
+    r = resp(data)
+    rules = r.get("swmeteringsummary", [])
+    out({"success": True, "count": len(rules), "rules": rules})
+
+
+def cmd_inventory_metering_usage(args, client):
+    data = client.metering_usage(args.rule_id)
+    r = resp(data)
+    out({"success": True, "usage": r})
+
+
+def cmd_inventory_licenses(args, client):
+    data = client.licensed_software()
+    r = resp(data)
+    sw = r.get("licensesoftware", [])
+    out({"success": True, "count": len(sw), "software": sw})
+
+
+def cmd_inventory_software_licenses(args, client):
+    data = client.software_licenses(args.software_id)
+    r = resp(data)
+    lics = r.get("licenses", [])
+    out({"success": True, "count": len(lics), "licenses": lics})
+
+
+def cmd_inventory_scan_status(args, client):
+    data = client.scan_computers()
+    r = resp(data)
+    out({"success": True, "scan_status": r})
+
+
+def cmd_inventory_scan_all(args, client):
+    data = client.trigger_scan_all()
+    out({"success": True, "result": resp(data)})
+
+
+def cmd_inventory_scan(args, client):
+    ids = parse_ids(args.resource_ids)
+    data = client.trigger_scan(ids)
+    out({"success": True, "result": resp(data)})
 
-# ---------------------------------------------------------------------------
-# Inventory
-# ---------------------------------------------------------------------------
 
 def register_inventory(sub):
     p = sub.add_parser("inventory", help="Asset and software inventory")
     s = p.add_subparsers(dest="action", required=True)
 
-    s.add_parser("summary")
+    s.add_parser("summary").set_defaults(func=cmd_inventory_summary)
 
     ls = s.add_parser("computers")
     ls.add_argument("--domain", dest="domainfilter")
     ls.add_argument("--branch-office", dest="branchofficefilter")
     ls.add_argument("--custom-group", dest="customgroupfilter")
     ls.add_argument("--limit", type=int, default=50)
+    ls.set_defaults(func=cmd_inventory_computers)
 
     sw = s.add_parser("software")
     sw.add_argument("--search")
     sw.add_argument("--limit", type=int, default=50)
+    sw.set_defaults(func=cmd_inventory_software)
 
     hw = s.add_parser("hardware")
     hw.add_argument("--limit", type=int, default=50)
+    hw.set_defaults(func=cmd_inventory_hardware)
 
     cd = s.add_parser("computer-detail")
     cd.add_argument("--resource-id", required=True)
+    cd.set_defaults(func=cmd_inventory_computer_detail)
 
     isw = s.add_parser("installed-software")
     isw.add_argument("--resource-id", required=True)
+    isw.set_defaults(func=cmd_inventory_installed_software)
 
     swc = s.add_parser("software-computers")
     swc.add_argument("--software-id", required=True)
+    swc.set_defaults(func=cmd_inventory_software_computers)
 
-    s.add_parser("metering")
+    s.add_parser("metering").set_defaults(func=cmd_inventory_metering)
 
     mu = s.add_parser("metering-usage")
     mu.add_argument("--rule-id", required=True)
+    mu.set_defaults(func=cmd_inventory_metering_usage)
 
-    s.add_parser("licenses")
+    s.add_parser("licenses").set_defaults(func=cmd_inventory_licenses)
 
     sl = s.add_parser("software-licenses")
     sl.add_argument("--software-id", required=True)
+    sl.set_defaults(func=cmd_inventory_software_licenses)
 
-    s.add_parser("scan-status")
-    s.add_parser("scan-all")
+    s.add_parser("scan-status").set_defaults(func=cmd_inventory_scan_status)
+    s.add_parser("scan-all").set_defaults(func=cmd_inventory_scan_all)
 
     sc = s.add_parser("scan")
     sc.add_argument("--resource-ids", required=True, help="Comma-separated resource IDs")
+    sc.set_defaults(func=cmd_inventory_scan)
 
 
-def run_inventory(args, client):
-    if args.action == "summary":
-        data = client.inventory_summary()
-        out({"success": True, "summary": resp(data)})
-
-    elif args.action == "computers":
-        filters = {}
-        if args.domainfilter:
-            filters["domainfilter"] = args.domainfilter
-        if args.branchofficefilter:
-            filters["branchofficefilter"] = args.branchofficefilter
-        if args.customgroupfilter:
-            filters["customgroupfilter"] = args.customgroupfilter
-        filters["pagelimit"] = args.limit
-        data = client.inventory_computers(**filters)
-        r = resp(data)
-        computers = r.get("computers", [])
-        total = r.get("total", len(computers))
-        result = []
-        for c in computers:
-            result.append({
-                "resource_id": c.get("resource_id"),
-                "name": c.get("resource_name", c.get("full_name")),
-                "fqdn": c.get("fqdn_name"),
-                "domain": c.get("domain_netbios_name"),
-                "os": c.get("os_name", c.get("service_pack")),
-                "ip": c.get("ip_address"),
-                "mac": c.get("mac_address"),
-                "agent_version": c.get("agent_version"),
-                "live_status": c.get("computer_live_status"),
-                "branch_office": c.get("branch_office_name"),
-            })
-        out({"success": True, "total": total, "count": len(result), "computers": result})
-
-    elif args.action == "software":
-        if args.search:
-            items = client.search(
-                "inventory/software", "software_name", "software_name", args.search, limit=args.limit
-            )
-            out({"success": True, "count": len(items), "software": items})
-        else:
-            data = client.inventory_software(pagelimit=args.limit)
-            r = resp(data)
-            sw = r.get("software", [])
-            out({"success": True, "total": r.get("total", len(sw)), "count": len(sw), "software": sw})
-
-    elif args.action == "hardware":
-        data = client.inventory_hardware(pagelimit=args.limit)
-        r = resp(data)
-        hw = r.get("hardware", [])
-        out({"success": True, "total": r.get("total", len(hw)), "count": len(hw), "hardware": hw})
+# ---------------------------------------------------------------------------
+# Patch Management
+# ---------------------------------------------------------------------------
 
-    elif args.action == "computer-detail":
-        data = client.computer_detail(args.resource_id)
-        out({"success": True, "detail": resp(data)})
+def cmd_patch_details(args, client):
+    filters = {}
+    if args.domainfilter:
+        filters["domainfilter"] = args.domainfilter
+    if args.severityfilter is not None:
+        filters["severityfilter"] = args.severityfilter
+    if args.patchstatusfilter is not None:
+        filters["patchstatusfilter"] = args.patchstatusfilter
+    data = client.patch_alldetails(args.patch_id, **filters)
+    r = resp(data)
+    details = r.get("allpatchdetails", [])
+    out({"success": True, "patch_id": args.patch_id, "total": r.get("total", len(details)),
+         "count": len(details), "details": details})
 
-    elif args.action == "installed-software":
-        data = client.installed_software(args.resource_id)
-        r = resp(data)
-        sw = r.get("installedsoftware", r.get("installed_software", []))
-        if isinstance(sw, list):
-            out({"success": True, "count": len(sw), "software": sw})
-        else:
-            out({"success": True, "software": r})
-
-    elif args.action == "software-computers":
-        data = client.software_computers(args.software_id)
-        r = resp(data)
-        comps = r.get("computers", [])
-        out({"success": True, "count": len(comps), "computers": comps})
 
-    elif args.action == "metering":
-        data = client.metering_rules()
-        r = resp(data)
-        rules = r.get("swmeteringsummary", [])
-        out({"success": True, "count": len(rules), "rules": rules})
+def cmd_patch_systems(args, client):
+    filters = {"pagelimit": args.limit}
+    if args.domainfilter:
+        filters["domainfilter"] = args.domainfilter
+    if args.branchofficefilter:
+        filters["branchofficefilter"] = args.branchofficefilter
+    data = client.patch_systems(**filters)
+    r = resp(data)
+    systems = r.get("allsystems", r.get("systems", []))
+    out({"success": True, "total": r.get("total", len(systems)),
+         "count": len(systems), "systems": systems})
 
-    elif args.action == "metering-usage":
-        data = client.metering_usage(args.rule_id)
-        r = resp(data)
-        out({"success": True, "usage": r})
 
-    elif args.action == "licenses":
-        data = client.licensed_software()
-        r = resp(data)
-        sw = r.get("licensesoftware", [])
-        out({"success": True, "count": len(sw), "software": sw})
+def cmd_patch_scan_status(args, client):
+    filters = {"pagelimit": args.limit}
+    if args.domainfilter:
+        filters["domainfilter"] = args.domainfilter
+    data = client.patch_scan_status(**filters)
+    r = resp(data)
+    out({"success": True, "scan_status": r})
 
-    elif args.action == "software-licenses":
-        data = client.software_licenses(args.software_id)
-        r = resp(data)
-        lics = r.get("licenses", [])
-        out({"success": True, "count": len(lics), "licenses": lics})
 
-    elif args.action == "scan-status":
-        data = client.scan_computers()
-        r = resp(data)
-        out({"success": True, "scan_status": r})
+def cmd_patch_approve(args, client):
+    ids = parse_ids(args.patch_ids)
+    data = client.patch_approve(ids)
+    out({"success": True, "result": resp(data), "patch_ids": ids})
 
-    elif args.action == "scan-all":
-        data = client.trigger_scan_all()
-        out({"success": True, "result": resp(data)})
 
-    elif args.action == "scan":
-        ids = [int(x.strip()) for x in args.resource_ids.split(",")]
-        data = client.trigger_scan(ids)
-        out({"success": True, "result": resp(data)})
+def cmd_patch_decline(args, client):
+    ids = parse_ids(args.patch_ids)
+    data = client.patch_decline(ids)
+    out({"success": True, "result": resp(data), "patch_ids": ids})
 
 
-# ---------------------------------------------------------------------------
-# Patch Management
-# ---------------------------------------------------------------------------
+def cmd_patch_scan(args, client):
+    data = client.patch_scan()
+    out({"success": True, "result": resp(data)})
+
 
 def register_patch(sub):
     p = sub.add_parser("patch", help="Patch management")
@@ -248,78 +336,66 @@ def register_patch(sub):
                      help="0=Unrated, 1=Low, 2=Moderate, 3=Important, 4=Critical")
     pd.add_argument("--status", dest="patchstatusfilter", type=int,
                      help="201=Installed, 202=Missing, 206=Failed")
+    pd.set_defaults(func=cmd_patch_details)
 
     sy = s.add_parser("systems")
     sy.add_argument("--domain", dest="domainfilter")
     sy.add_argument("--branch-office", dest="branchofficefilter")
     sy.add_argument("--limit", type=int, default=50)
+    sy.set_defaults(func=cmd_patch_systems)
 
     ss = s.add_parser("scan-status")
     ss.add_argument("--domain", dest="domainfilter")
     ss.add_argument("--limit", type=int, default=50)
+    ss.set_defaults(func=cmd_patch_scan_status)
 
     ap = s.add_parser("approve")
     ap.add_argument("--patch-ids", required=True, help="Comma-separated patch IDs")
+    ap.set_defaults(func=cmd_patch_approve)
 
     dc = s.add_parser("decline")
     dc.add_argument("--patch-ids", required=True, help="Comma-separated patch IDs")
+    dc.set_defaults(func=cmd_patch_decline)
 
-    s.add_parser("scan")
+    s.add_parser("scan").set_defaults(func=cmd_patch_scan)
 
 
-def run_patch(args, client):
-    if args.action == "details":
-        filters = {}
-        if args.domainfilter:
-            filters["domainfilter"] = args.domainfilter
-        if args.severityfilter is not None:
-            filters["severityfilter"] = args.severityfilter
-        if args.patchstatusfilter is not None:
-            filters["patchstatusfilter"] = args.patchstatusfilter
-        data = client.patch_alldetails(args.patch_id, **filters)
-        r = resp(data)
-        details = r.get("allpatchdetails", [])
-        out({"success": True, "patch_id": args.patch_id, "total": r.get("total", len(details)),
-             "count": len(details), "details": details})
-
-    elif args.action == "systems":
-        filters = {"pagelimit": args.limit}
-        if args.domainfilter:
-            filters["domainfilter"] = args.domainfilter
-        if args.branchofficefilter:
-            filters["branchofficefilter"] = args.branchofficefilter
-        data = client.patch_systems(**filters)
-        r = resp(data)
-        systems = r.get("allsystems", r.get("systems", []))
-        out({"success": True, "total": r.get("total", len(systems)),
-             "count": len(systems), "systems": systems})
-
-    elif args.action == "scan-status":
-        filters = {"pagelimit": args.limit}
-        if args.domainfilter:
-            filters["domainfilter"] = args.domainfilter
-        data = client.patch_scan_status(**filters)
-        r = resp(data)
-        out({"success": True, "scan_status": r})
+# ---------------------------------------------------------------------------
+# SoM (Scope of Management)
+# ---------------------------------------------------------------------------
 
-    elif args.action == "approve":
-        ids = [int(x.strip()) for x in args.patch_ids.split(",")]
-        data = client.patch_approve(ids)
-        out({"success": True, "result": resp(data), "patch_ids": ids})
+def cmd_som_computers(args, client):
+    filters = {"pagelimit": args.limit}
+    if args.domainfilter:
+        filters["domainfilter"] = args.domainfilter
+    data = client.som_computers(**filters)
+    r = resp(data)
+    comps = r.get("computers", [])
+    out({"success": True, "total": r.get("total", len(comps)),
+         "count": len(comps), "computers": comps})
 
-    elif args.action == "decline":
-        ids = [int(x.strip()) for x in args.patch_ids.split(",")]
-        data = client.patch_decline(ids)
-        out({"success": True, "result": resp(data), "patch_ids": ids})
 
-    elif args.action == "scan":
-        data = client.patch_scan()
-        out({"success": True, "result": resp(data)})
+def cmd_som_remote_offices(args, client):
+    data = client.som_remote_offices()
+    r = resp(data)
+    offices = r.get("remoteoffice", r.get("remote_offices", []))
+    if isinstance(offices, list):
+        out({"success": True, "count": len(offices), "offices": offices})
+    else:
+        out({"success": True, "offices": r})
 
 
-# ---------------------------------------------------------------------------
-# SoM (Scope of Management)
-# ---------------------------------------------------------------------------
+def cmd_som_install_agent(args, client):
+    ids = parse_ids(args.resource_ids)
+    data = client.som_install_agent(ids)
+    out({"success": True, "result": resp(data), "resource_ids": ids})
+
+
+def cmd_som_uninstall_agent(args, client):
+    ids = parse_ids(args.resource_ids)
+    data = client.som_uninstall_agent(ids)
+    out({"success": True, "result": resp(data), "resource_ids": ids})
+
 
 def register_som(sub):
     p = sub.add_parser("som", help="Scope of Management -- agents and offices")
@@ -328,56 +404,30 @@ def register_som(sub):
     c = s.add_parser("computers")
     c.add_argument("--domain", dest="domainfilter")
     c.add_argument("--limit", type=int, default=50)
+    c.set_defaults(func=cmd_som_computers)
 
-    s.add_parser("remote-offices")
+    s.add_parser("remote-offices").set_defaults(func=cmd_som_remote_offices)
 
     ia = s.add_parser("install-agent")
     ia.add_argument("--resource-ids", required=True, help="Comma-separated resource IDs")
+    ia.set_defaults(func=cmd_som_install_agent)
 
     ua = s.add_parser("uninstall-agent")
     ua.add_argument("--resource-ids", required=True, help="Comma-separated resource IDs")
-
-
-def run_som(args, client):
-    if args.action == "computers":
-        filters = {"pagelimit": args.limit}
-        if args.domainfilter:
-            filters["domainfilter"] = args.domainfilter
-        data = client.som_computers(**filters)
-        r = resp(data)
-        comps = r.get("computers", [])
-        out({"success": True, "total": r.get("total", len(comps)),
-             "count": len(comps), "computers": comps})
-
-    elif args.action == "remote-offices":
-        data = client.som_remote_offices()
-        r = resp(data)
-        offices = r.get("remoteoffice", r.get("remote_offices", []))
-        if isinstance(offices, list):
-            out({"success": True, "count": len(offices), "offices": offices})
-        else:
-            out({"success": True, "offices": r})
-
-    elif args.action == "install-agent":
-        ids = [int(x.strip()) for x in args.resource_ids.split(",")]
-        data = client.som_install_agent(ids)
-        out({"success": True, "result": resp(data), "resource_ids": ids})
-
-    elif args.action == "uninstall-agent":
-        ids = [int(x.strip()) for x in args.resource_ids.split(",")]
-        data = client.som_uninstall_agent(ids)
-        out({"success": True, "result": resp(data), "resource_ids": ids})
+    ua.set_defaults(func=cmd_som_uninstall_agent)
 
 
 # ---------------------------------------------------------------------------
 # Main dispatcher
 # ---------------------------------------------------------------------------
 
+# Each module registers its subparser; every action parser carries its
+# handler as args.func.
 MODULES = {
-    "server": (register_server, run_server),
-    "inventory": (register_inventory, run_inventory),
-    "patch": (register_patch, run_patch),
-    "som": (register_som, run_som),
+    "server": register_server,
+    "inventory": register_inventory,
+    "patch": register_patch,
+    "som": register_som,
 }
 
 
@@ -385,13 +435,15 @@ def main():
     parser = argparse.ArgumentParser(description="Endpoint Central CLI", prog="ec.py")
     sub = parser.add_subparsers(dest="module", required=True, help="EC module")
 
-    for register_fn, _ in MODULES.values():
+    for register_fn in MODULES.values():
         register_fn(sub)
 
     args = parser.parse_args()
-    client = ECClient()
-    _, run_fn = MODULES[args.module]
-    run_fn(args, client)
+
+    # Deferred so --help and usage errors don't pay for importing requests
+    from ec_client import get_client
+    client = get_client()
+    args.func(args, client)
 
 
 if __name__ == "__main__":
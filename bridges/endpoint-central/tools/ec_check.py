@@ -22,6 +22,7 @@ Exit 0 = healthy, exit 1 = unhealthy.
 import json
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 try:
     from ec_client import ECClient
@@ -30,31 +31,16 @@ except ImportError:
     from ec_client import ECClient
 
 
-def main():
-    results = {"bridge": "endpoint-central", "checks": []}
-
-    try:
-        client = ECClient()
-        results["checks"].append({"name": "auth", "status": "pass"})
-    except SystemExit:
-        results["checks"].append({"name": "auth", "status": "fail", "error": "Authentication failed"})
-        print(json.dumps(results))
-        sys.exit(1)
-    except Exception as e:
-        results["checks"].append({"name": "auth", "status": "fail", "error": str(e)})
-        print(json.dumps(results))
-        sys.exit(1)
-
+def _check_discover(client):
     try:
         data = client.discover()
         resp = data.get("message_response", {})
-        results["checks"].append({"name": "discover", "status": "pass"})
-        results["server"] = resp
+        return {"name": "discover", "status": "pass"}, {"server": resp}
     except Exception as e:
-        results["checks"].append({"name": "discover", "status": "fail", "error": str(e)})
-        print(json.dumps(results))
-        sys.exit(1)
+        return {"name": "discover", "status": "fail", "error": str(e)}, {}
 
+
+def _check_properties(client):
     try:
         data = client.server_properties()
         resp = data.get("message_response", {})
@@ -62,20 +48,57 @@ def main():
         domains = props.get("domains", [])
         groups = props.get("customgroups", [])
         offices = props.get("branchoffices", [])
-        results["checks"].append({"name": "properties", "status": "pass"})
-        results["domains"] = len(domains)
-        results["custom_groups"] = len(groups)
-        results["branch_offices"] = len(offices)
+        return {"name": "properties", "status": "pass"}, {
+            "domains": len(domains),
+            "custom_groups": len(groups),
+            "branch_offices": len(offices),
+        }
     except Exception as e:
-        results["checks"].append({"name": "properties", "status": "warn", "error": str(e)})
+        return {"name": "properties", "status": "warn", "error": str(e)}, {}
+
 
+def _check_inventory(client):
     try:
         data = client.inventory_summary()
         resp = data.get("message_response", {})
-        results["checks"].append({"name": "inventory", "status": "pass"})
-        results["inventory_summary"] = resp
+        return {"name": "inventory", "status": "pass"}, {"inventory_summary": resp}
     except Exception as e:
-        results["checks"].append({"name": "inventory", "status": "warn", "error": str(e)})
+        return {"name": "inventory", "status": "warn", "error": str(e)}, {}
+
+
+def main():
+    results = {"bridge": "endpoint-central", "checks": []}
+
+    try:
+        client = ECClient()
+        results["checks"].append({"name": "auth", "status": "pass"})
+    except SystemExit:
+        results["checks"].append({"name": "auth", "status": "fail", "error": "Authentication failed"})
+        print(json.dumps(results))
+        sys.exit(1)
+    except Exception as e:
+        results["checks"].append({"name": "auth", "status": "fail", "error": str(e)})
+        print(json.dumps(results))
+        sys.exit(1)
+
+    # The three probes are independent; run them side by side so the check
+    # takes as long as the slowest one rather than all three in a row.
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        discover = pool.submit(_check_discover, client)
+        properties = pool.submit(_check_properties, client)
+        inventory = pool.submit(_check_inventory, client)
+
+        check, fields = discover.result()
+        results["checks"].append(check)
+        results.update(fields)
+        if check["status"] == "fail":
+            print(json.dumps(results))
+            sys.exit(1)
+
+        for future in (properties, inventory):
+            check, fields = future.result()
+            results["checks"].append(check)
+            results.update(fields)
 
     passed = sum(1 for c in results["checks"] if c["status"] == "pass")
     total = len(results["checks"])
@@ -24,15 +24,30 @@ Environment:
     EC_USERNAME        (fallback) Username for token generation
     EC_PASSWORD        (fallback) Base64-encoded password
     EC_VERIFY_SSL      Set to "false" to disable TLS verification (default: false for on-prem)
+    EC_TOKEN_CACHE     Set to "1" to reuse a username/password login token across runs
+    EC_CACHE_DIR       Token cache location (default: /opt/bridge/data/cache)
 """
 
 import base64
+import hashlib
 import json
 import os
+import re
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
 import requests
 import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 INSTANCE = os.environ.get("EC_INSTANCE_URL", "").rstrip("/")
 AUTH_TOKEN = os.environ.get("EC_AUTH_TOKEN", "") or os.environ.get("EC_ADMIN_TOKEN", "")
@@ -45,22 +60,181 @@ if not VERIFY_SSL:
 
 API_BASE = "/api/1.4"
 
+# Largest pagelimit the API accepts
+MAX_PAGE_SIZE = 1000
+
+# Upper bound on concurrent requests when fanning out independent calls
+MAX_WORKERS = 8
+
+# Every request goes to the one EC server; keep enough keep-alive connections
+# for concurrent fan-out so surplus sockets are not discarded and re-handshaken.
+# requests speaks HTTP/1.1 only, so each in-flight request holds its own
+# connection; responses are still compressed, since requests sends
+# "Accept-Encoding: gzip, deflate" and decodes transparently.
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 32
+
+# Transient gateway errors and dropped connections are retried with backoff.
+# Only GETs are replayed: POSTs trigger scans, approvals and agent installs.
+RETRY_OPTIONS = {
+    "total": 3,
+    "backoff_factor": 0.3,
+    "status_forcelist": (502, 503, 504),
+    "allowed_methods": frozenset({"GET"}),
+    "raise_on_status": False,
+}
+
+# Read-mostly endpoints (server info, summaries, metering and scan status)
+# are reused for this many seconds within one client. Any POST through the
+# client clears the cache.
+CACHE_TTL = 300
+
+# Bulk actions (scans, patch approvals, agent installs) are split into POSTs
+# of at most BATCH_SIZE IDs, since the server rejects or times out on very
+# large ID lists. Chunks are sent BATCH_WORKERS at a time; every chunk is
+# attempted even if another fails (see ECBatchError).
+BATCH_SIZE = 500
+BATCH_WORKERS = 4
+
+# Opt-in (EC_TOKEN_CACHE=1): a token obtained by username/password login is
+# kept on disk (mode 0600) and reused by later runs until shortly before it
+# expires, skipping the login round trip. TOKEN_TTL applies when the login
+# response carries no expiry. A 401 drops the cached token and logs in again.
+TOKEN_CACHE_ENABLED = os.environ.get("EC_TOKEN_CACHE", "").lower() in ("1", "true", "yes")
+CACHE_DIR = Path(os.environ.get("EC_CACHE_DIR", "/opt/bridge/data/cache"))
+TOKEN_CACHE = CACHE_DIR / "ec_auth_token.json"
+TOKEN_TTL = 3600
+TOKEN_EXPIRY_MARGIN = 60
+
+# EC_PASSWORD may be given plain or already base64-encoded (canonical form)
+_B64_RE = re.compile(r"[A-Za-z0-9+/]+={0,2}")
+
+
+class ECError(requests.HTTPError):
+    """An error response from the EC API, with its decoded error envelope.
+
+    Subclasses requests.HTTPError, so existing handlers keep working.
+    """
+
+    def __init__(self, status, path, body=None, response=None):
+        self.status = status
+        self.path = path
+        self.body = body
+        detail = ""
+        if isinstance(body, dict):
+            detail = body.get("error_description") or body.get("error_code") or ""
+        elif body:
+            detail = str(body)[:200]
+        msg = f"HTTP {status} from {path}"
+        super().__init__(f"{msg}: {detail}" if detail else msg, response=response)
+
+    @property
+    def retryable(self):
+        """True for throttling and server-side failures; 4xx are permanent."""
+        return self.status == 429 or self.status >= 500
+
+
+class ECBatchError(ECError):
+    """Some chunks of a batched POST failed while others were applied.
+
+    applied_ids and failed_ids partition the requested IDs; errors holds the
+    exception of each failed chunk and result the merged responses of the
+    applied ones. status, body and response are those of the first failed
+    chunk.
+    """
+
+    def __init__(self, path, applied_ids, failed_ids, errors, result):
+        first = errors[0]
+        self.status = getattr(first, "status", None)
+        self.path = path
+        self.body = getattr(first, "body", None)
+        self.applied_ids = applied_ids
+        self.failed_ids = failed_ids
+        self.errors = errors
+        self.result = result
+        total = len(applied_ids) + len(failed_ids)
+        requests.HTTPError.__init__(
+            self,
+            f"{len(failed_ids)} of {total} IDs failed on {path} ({first}); "
+            f"{len(applied_ids)} applied. Failed IDs: {failed_ids}",
+            response=getattr(first, "response", None),
+        )
+
+    @property
+    def retryable(self):
+        """True if every failed chunk can be retried."""
+        return all(getattr(e, "retryable", True) for e in self.errors)
+
+
+def _merge_batch_results(results):
+    """Merge the responses of a batched POST's chunks.
+
+    Top-level fields come from the first chunk. In message_response, lists
+    are concatenated and numbers summed; any other value is kept only when
+    every chunk returned the same one.
+    """
+    merged = dict(results[0])
+    responses = [r.get("message_response") for r in results]
+    responses = [r for r in responses if isinstance(r, dict)]
+    if not responses:
+        return merged
+    combined = {}
+    for k in dict.fromkeys(k for r in responses for k in r):
+        values = [r[k] for r in responses if k in r]
+        if all(isinstance(v, list) for v in values):
+            combined[k] = [x for v in values for x in v]
+        elif all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+            combined[k] = sum(values)
+        elif all(v == values[0] for v in values):
+            combined[k] = values[0]
+    merged["message_response"] = combined
+    return merged
+
+
+class _Flight:
+    """One in-progress ECClient._cached_get request that callers wait on."""
+
+    __slots__ = ("event", "data", "error", "retry")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.data = None
+        self.error = None
+        self.retry = None  # the flight that retries this one after a failure
+
 
 def die(msg):
     print(msg, file=sys.stderr)
     sys.exit(1)
 
 
+def parse_json(r):
+    """Decode a response body, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(r.content)
+    return r.json()
+
+
+def dump_json(obj):
+    """Serialize obj as indented JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2)
+
+
 def _get_token():
-    """Return auth token from env or by authenticating with username/password."""
+    """Return auth token from env, the token cache, or by logging in."""
     if AUTH_TOKEN:
         return AUTH_TOKEN
     if not USERNAME or not PASSWORD:
         die("EC_AUTH_TOKEN not set and EC_USERNAME/EC_PASSWORD not provided.")
+    return _read_token_cache() or _login()
+
+
+def _login():
+    """Authenticate with username/password and return a fresh auth token."""
     pw = PASSWORD
-    try:
-        base64.b64decode(pw, validate=True)
-    except Exception:
+    if not (len(pw) % 4 == 0 and _B64_RE.fullmatch(pw)):
         pw = base64.b64encode(pw.encode()).decode()
     r = requests.post(
         f"{INSTANCE}{API_BASE}/desktop/authentication",
@@ -70,18 +244,81 @@ def _get_token():
         timeout=15,
     )
     r.raise_for_status()
-    data = r.json()
-    token = (
+    data = parse_json(r)
+    auth_data = (
         data.get("message_response", {})
         .get("authentication", {})
         .get("auth_data", {})
-        .get("auth_token")
     )
+    token = auth_data.get("auth_token")
     if not token:
         die(f"Authentication failed: {json.dumps(data)}")
+    _write_token_cache(token, auth_data.get("expiry_time"))
     return token
 
 
+def _token_cache_key():
+    """Identify the server and credentials a cached token belongs to."""
+    ident = "\0".join((INSTANCE, USERNAME, PASSWORD)).encode()
+    return hashlib.blake2b(ident, digest_size=16).hexdigest()
+
+
+def _read_token_cache():
+    if not TOKEN_CACHE_ENABLED:
+        return ""
+    try:
+        cached = json.loads(TOKEN_CACHE.read_text())
+    except (OSError, ValueError):
+        return ""
+    if cached.get("key") != _token_cache_key():
+        return ""
+    if cached.get("exp", 0) - time.time() <= TOKEN_EXPIRY_MARGIN:
+        return ""
+    return cached.get("token", "")
+
+
+def _write_token_cache(token, expiry_time=None):
+    if not TOKEN_CACHE_ENABLED:
+        return
+    try:
+        exp = float(expiry_time)
+        if exp > 1e12:
+            exp /= 1000  # EC reports epoch milliseconds
+    except (TypeError, ValueError):
+        exp = time.time() + TOKEN_TTL
+    payload = json.dumps({"key": _token_cache_key(), "token": token, "exp": exp})
+    tmp = TOKEN_CACHE.with_name(f"{TOKEN_CACHE.name}.{os.getpid()}.tmp")
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            f.write(payload)
+        os.replace(tmp, TOKEN_CACHE)
+    except OSError:
+        pass
+
+
+def _clear_token_cache():
+    try:
+        TOKEN_CACHE.unlink()
+    except OSError:
+        pass
+
+
+def _page_limit(limit):
+    """Page size for fetching `limit` records (None = all) at 1000 per page.
+
+    Every page of a walk must share one pagelimit (the server derives the
+    offset from page * pagelimit), so a limit above 1000 is spread evenly
+    over the pages it needs: 1500 is fetched as 2 x 750 rather than
+    2 x 1000 with 500 discarded.
+    """
+    if not limit:
+        return MAX_PAGE_SIZE
+    pages = -(-limit // MAX_PAGE_SIZE)
+    return -(-limit // pages)
+
+
 class ECClient:
     """REST client for Endpoint Central API v1.4."""
 
@@ -89,26 +326,167 @@ class ECClient:
         if not INSTANCE:
             die("EC_INSTANCE_URL not set.")
         self.base = f"{INSTANCE}{API_BASE}"
+        self._base_slash = self.base + "/"
         self.token = _get_token()
+        self._can_relogin = TOKEN_CACHE_ENABLED and not AUTH_TOKEN
+        self._login_lock = threading.Lock()
         self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=POOL_CONNECTIONS,
+            pool_maxsize=POOL_MAXSIZE,
+            max_retries=Retry(**RETRY_OPTIONS),
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         self.session.headers.update({"Authorization": self.token})
         self.session.verify = VERIFY_SSL
+        self._cache = {}
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        self._list_keys = {}
+
+    def _request(self, method, path, **kwargs):
+        url = self._base_slash + path.lstrip("/")
+        # Each request carries the token it was sent with, so a 401 can be
+        # matched against the token that was rejected
+        token = self.token
+        r = self.session.request(method, url, headers={"Authorization": token}, **kwargs)
+        if r.status_code == 401 and self._can_relogin:
+            # A cached login token may have been revoked or rotated. The first
+            # thread to see the 401 logs in again; concurrent requests rejected
+            # with the same token reuse the new one. Each is retried once.
+            with self._login_lock:
+                if self.token == token:
+                    _clear_token_cache()
+                    self.token = _login()
+                    self.session.headers["Authorization"] = self.token
+                token = self.token
+            r = self.session.request(method, url, headers={"Authorization": token}, **kwargs)
+        if r.status_code >= 400:
+            try:
+                body = parse_json(r) if r.content else None
+            except ValueError:
+                body = r.text
+            raise ECError(r.status_code, path, body, response=r)
+        return parse_json(r)
 
     def get(self, path, params=None, timeout=30):
-        url = f"{self.base}/{path.lstrip('/')}"
-        r = self.session.get(url, params=params, timeout=timeout)
-        r.raise_for_status()
-        return r.json()
+        return self._request("GET", path, params=params, timeout=timeout)
+
+    def _cached_get(self, path, params=None, ttl=CACHE_TTL):
+        """GET through the per-client TTL cache, keyed on path and every param.
+
+        Concurrent misses for the same key share one request: the first
+        caller fetches while the others wait for its result. If that request
+        fails, the waiters get the same exception. A retryable failure
+        (ECError.retryable, or a connection error) is retried by one waiter,
+        and the rest share that attempt's outcome.
+        """
+        key = (path, tuple(sorted((params or {}).items())))
+        cached = self._cache.get(key)
+        if cached and time.monotonic() - cached[0] < ttl:
+            return cached[1]
+
+        with self._inflight_lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+        if leader:
+            return self._fetch_flight(key, flight, path, params)
+
+        flight.event.wait()
+        if flight.error is not None and getattr(flight.error, "retryable", True):
+            with self._inflight_lock:
+                retry = flight.retry
+                leader = retry is None
+                if leader:
+                    # Join a fetch a new caller may already have started
+                    retry = self._inflight.get(key)
+                    leader = retry is None
+                    if leader:
+                        retry = self._inflight[key] = _Flight()
+                    flight.retry = retry
+            if leader:
+                return self._fetch_flight(key, retry, path, params)
+            flight = retry
+            flight.event.wait()
+
+        if flight.error is not None:
+            raise flight.error
+        return flight.data
+
+    def _fetch_flight(self, key, flight, path, params):
+        """Run the GET for a _cached_get flight and publish its outcome."""
+        try:
+            flight.data = self.get(path, params)
+            self._cache[key] = (time.monotonic(), flight.data)
+            return flight.data
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+            flight.event.set()
 
     def post(self, path, json_body=None, timeout=30):
-        url = f"{self.base}/{path.lstrip('/')}"
-        r = self.session.post(url, json=json_body, timeout=timeout)
-        r.raise_for_status()
-        return r.json()
+        self._cache.clear()
+        return self._request("POST", path, json=json_body, timeout=timeout)
+
+    def _batched_post(self, path, body_key, ids, batch=BATCH_SIZE):
+        """POST an ID list in chunks of `batch` and merge the responses.
+
+        A list that fits in one chunk is a single POST and its response is
+        returned unchanged. Otherwise chunks are sent concurrently and merged
+        by _merge_batch_results. Chunks are independent requests and all of
+        them are attempted, so if any fail the others are still applied:
+        ECBatchError is raised listing the applied and failed IDs.
+        """
+        ids = list(ids)
+        if len(ids) <= batch:
+            return self.post(path, json_body={body_key: ids})
+
+        chunks = [ids[i:i + batch] for i in range(0, len(ids), batch)]
+        with ThreadPoolExecutor(max_workers=min(BATCH_WORKERS, len(chunks))) as pool:
+            futures = [
+                pool.submit(self.post, path, json_body={body_key: chunk})
+                for chunk in chunks
+            ]
+
+        results, applied, failed, errors = [], [], [], []
+        for chunk, future in zip(chunks, futures):
+            try:
+                results.append(future.result())
+                applied.extend(chunk)
+            except Exception as e:
+                failed.extend(chunk)
+                errors.append(e)
+        merged = _merge_batch_results(results) if results else {}
+        if errors:
+            raise ECBatchError(path, applied, failed, errors, merged)
+        return merged
+
+    def gather(self, *calls):
+        """Run independent client calls concurrently; results in call order.
+
+        Each call is a zero-argument callable, e.g.
+        ``client.gather(client.inventory_summary, lambda: client.patch_systems(page=1))``.
+        Total latency is roughly that of the slowest call rather than the sum.
+        The first exception raised by any call propagates to the caller.
+        """
+        if len(calls) <= 1:
+            return [call() for call in calls]
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(calls))) as pool:
+            return list(pool.map(lambda call: call(), calls))
 
     def get_all(self, path, params=None, key=None, limit=None):
         """Paginate through all results for an endpoint.
 
+        Page 1 is fetched first; when it reports a total, the remaining pages
+        are fetched concurrently and appended in page order. Endpoints that
+        do not report a total are walked page by page.
+
         Args:
             path: API path
             params: extra query params
@@ -118,42 +496,90 @@ class ECClient:
             list of all result objects
         """
         params = dict(params or {})
-        page = 1
-        page_limit = min(limit or 1000, 1000)
-        all_items = []
+        page_limit = _page_limit(limit)
+        params["pagelimit"] = page_limit
+
+        resp, key, items = self._get_page(path, params, 1, key)
+        if not items:
+            return []
+        all_items = list(items)
+
+        total = resp.get("total")
+        if total is not None:
+            wanted = min(total, limit) if limit else total
+            last_page = 1 if len(items) < page_limit else -(-wanted // page_limit)
+            if last_page > 1:
+                pages = range(2, last_page + 1)
+                with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(pages))) as pool:
+                    for _, _, items in pool.map(
+                        lambda page: self._get_page(path, params, page, key), pages
+                    ):
+                        if not items:
+                            break
+                        all_items.extend(items)
+                        if len(items) < page_limit:
+                            break
+            return all_items[:limit] if limit else all_items
 
+        page = 1
         while True:
-            params["page"] = page
-            params["pagelimit"] = page_limit
-            data = self.get(path, params)
-            resp = data.get("message_response", data)
-
-            if key is None:
-                for k, v in resp.items():
-                    if isinstance(v, list):
-                        key = k
-                        break
-
-            items = resp.get(key, []) if key else []
+            if limit and len(all_items) >= limit:
+                return all_items[:limit]
+            if len(items) < page_limit:
+                return all_items
+            page += 1
+            _, _, items = self._get_page(path, params, page, key)
             if not items:
-                break
-
+                return all_items
             all_items.extend(items)
 
-            if limit and len(all_items) >= limit:
-                all_items = all_items[:limit]
-                break
+    def iter_all(self, path, params=None, key=None, limit=None):
+        """Yield results from a paginated endpoint one page at a time.
 
-            total = resp.get("total")
-            if total is not None and len(all_items) >= total:
-                break
+        Unlike get_all, pages are fetched lazily and sequentially, so only
+        one page is held in memory and callers can write items out as they
+        arrive. Prefer get_all when the whole result set is needed at once.
+        Arguments are as for get_all.
+        """
+        params = dict(params or {})
+        page_limit = _page_limit(limit)
+        params["pagelimit"] = page_limit
+        count = 0
+        page = 1
 
-            if len(items) < page_limit:
-                break
+        while True:
+            resp, key, items = self._get_page(path, params, page, key)
+            if not items:
+                return
+            if limit and count + len(items) >= limit:
+                yield from items[:limit - count]
+                return
+            yield from items
+            count += len(items)
 
+            total = resp.get("total")
+            if total is not None and count >= total:
+                return
+            if len(items) < page_limit:
+                return
             page += 1
 
-        return all_items
+    def _get_page(self, path, params, page, key):
+        """Fetch one page; returns (response body, list key, items).
+
+        With key=None the list key is detected on the first page of a call
+        (and passed back for later pages), then remembered per path so later
+        calls skip detection while the key is still present.
+        """
+        data = self.get(path, {**params, "page": page})
+        resp = data.get("message_response", data)
+        if key is None:
+            key = self._list_keys.get(path)
+            if key not in resp:
+                key = next((k for k, v in resp.items() if isinstance(v, list)), None)
+                if key is not None:
+                    self._list_keys[path] = key
+        return resp, key, (resp.get(key) or []) if key else []
 
     def search(self, path, search_type, column, value, params=None, limit=100):
         """Search within a paginated endpoint."""
@@ -163,17 +589,45 @@ class ECClient:
         params["searchvalue"] = value
         return self.get_all(path, params, limit=limit)
 
+    def search_many(self, path, search_type, column, values, params=None, limit=100,
+                    id_key="resource_id"):
+        """Run one search per value concurrently and concatenate the results.
+
+        Results keep the order of `values`; records that share an `id_key`
+        value (e.g. a machine matching two hostnames) are returned once.
+        `limit` applies to each value's search.
+        """
+        values = list(dict.fromkeys(values))
+        if not values:
+            return []
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(values))) as pool:
+            batches = pool.map(
+                lambda value: self.search(path, search_type, column, value, params, limit),
+                values,
+            )
+            results = []
+            seen = set()
+            for items in batches:
+                for item in items:
+                    ident = item.get(id_key) if isinstance(item, dict) else None
+                    if ident is not None:
+                        if ident in seen:
+                            continue
+                        seen.add(ident)
+                    results.append(item)
+        return results
+
     # -- Convenience methods --------------------------------------------------
 
     def discover(self):
-        return self.get("desktop/discover")
+        return self._cached_get("desktop/discover")
 
     def server_properties(self):
-        return self.get("desktop/serverproperties")
+        return self._cached_get("desktop/serverproperties")
 
     # Inventory
     def inventory_summary(self):
-        return self.get("inventory/allsummary")
+        return self._cached_get("inventory/allsummary")
 
     def inventory_computers(self, **filters):
         return self.get("som/computers", params=filters)
@@ -194,25 +648,25 @@ class ECClient:
         return self.get("som/computers", params={"swid": software_id})
 
     def metering_rules(self):
-        return self.get("inventory/swmeteringsummary")
+        return self._cached_get("inventory/swmeteringsummary")
 
     def metering_usage(self, rule_id):
         return self.get("som/computers", params={"swmeruleid": rule_id})
 
     def licensed_software(self):
-        return self.get("inventory/licensesoftware")
+        return self._cached_get("inventory/licensesoftware")
 
     def software_licenses(self, software_id):
         return self.get("inventory/licenses", params={"swid": software_id})
 
     def scan_computers(self):
-        return self.get("inventory/scancomputers")
+        return self._cached_get("inventory/scancomputers")
 
     def trigger_scan_all(self):
         return self.post("inventory/computers/scanall")
 
-    def trigger_scan(self, resource_ids):
-        return self.post("inventory/computers/scan", json_body={"resource_ids": resource_ids})
+    def trigger_scan(self, resource_ids, batch=BATCH_SIZE):
+        return self._batched_post("inventory/computers/scan", "resource_ids", resource_ids, batch)
 
     # Patch management
     def patch_alldetails(self, patch_id, **filters):
@@ -225,11 +679,11 @@ class ECClient:
     def patch_scan_status(self, **filters):
         return self.get("patch/scandetails", params=filters)
 
-    def patch_approve(self, patch_ids):
-        return self.post("patch/approve", json_body={"patch_ids": patch_ids})
+    def patch_approve(self, patch_ids, batch=BATCH_SIZE):
+        return self._batched_post("patch/approve", "patch_ids", patch_ids, batch)
 
-    def patch_decline(self, patch_ids):
-        return self.post("patch/decline", json_body={"patch_ids": patch_ids})
+    def patch_decline(self, patch_ids, batch=BATCH_SIZE):
+        return self._batched_post("patch/decline", "patch_ids", patch_ids, batch)
 
     def patch_scan(self):
         return self.post("patch/scan")
@@ -239,17 +693,32 @@ class ECClient:
         return self.get("som/computers", params=filters)
 
     def som_remote_offices(self):
-        return self.get("som/remoteoffice")
+        return self._cached_get("som/remoteoffice")
 
-    def som_install_agent(self, resource_ids):
-        return self.post("som/computers/installagent", json_body={"resource_ids": resource_ids})
+    def som_install_agent(self, resource_ids, batch=BATCH_SIZE):
+        return self._batched_post("som/computers/installagent", "resource_ids", resource_ids, batch)
 
-    def som_uninstall_agent(self, resource_ids):
-        return self.post("som/computers/uninstallagent", json_body={"resource_ids": resource_ids})
+    def som_uninstall_agent(self, resource_ids, batch=BATCH_SIZE):
+        return self._batched_post("som/computers/uninstallagent", "resource_ids", resource_ids, batch)
 
     # Filter params
     def filter_params(self):
-        return self.get("inventory/filterparams")
+        return self._cached_get("inventory/filterparams")
+
+
+_CLIENT = None
+
+
+def get_client():
+    """Return the process-wide ECClient, creating it on first use.
+
+    In-process callers share one session, so its keep-alive connections,
+    login token and response cache are reused across calls.
+    """
+    global _CLIENT
+    if _CLIENT is None:
+        _CLIENT = ECClient()
+    return _CLIENT
 
 
 def _main():
@@ -259,26 +728,26 @@ def _main():
     parser.add_argument("command", choices=["test", "discover", "properties", "computers", "software"])
     args = parser.parse_args()
 
-    client = ECClient()
+    client = get_client()
 
     if args.command == "test":
         d = client.discover()
         resp = d.get("message_response", {})
-        print(json.dumps({"success": True, "server": resp}, indent=2))
+        print(dump_json({"success": True, "server": resp}))
     elif args.command == "discover":
-        print(json.dumps(client.discover(), indent=2))
+        print(dump_json(client.discover()))
     elif args.command == "properties":
-        print(json.dumps(client.server_properties(), indent=2))
+        print(dump_json(client.server_properties()))
     elif args.command == "computers":
         data = client.som_computers(pagelimit=10)
         resp = data.get("message_response", {})
         computers = resp.get("computers", [])
-        print(json.dumps({"total": resp.get("total"), "count": len(computers), "computers": computers[:10]}, indent=2))
+        print(dump_json({"total": resp.get("total"), "count": len(computers), "computers": computers[:10]}))
     elif args.command == "software":
         data = client.inventory_software()
         resp = data.get("message_response", {})
         sw = resp.get("software", [])
-        print(json.dumps({"count": len(sw), "software": sw[:10]}, indent=2))
+        print(dump_json({"count": len(sw), "software": sw[:10]}))
 
 
 if __name__ == "__main__":
@@ -36,31 +36,67 @@ Data sources per agent:
 Features:
   - Multi-type: auto-classifies agents into the correct Freshservice type
   - Upsert: search by hostname, update if exists, create if new
-  - Always-update strategy on re-runs (keeps CMDB current)
+  - Skips unchanged payloads on re-runs; each asset is still re-sent at
+    least every ASSET_SYNC_HASH_TTL hours, reverting manual CMDB edits
   - Sync-state tracking in .sync-state.json
   - Dry-run mode for previewing payloads
   - Single-host mode for testing
   - Retirement marking for decommissioned assets
 """
 
+import hashlib
 import json
 import os
-import subprocess
+import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from pathlib import Path
 
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # These are imported by the caller -- we use them when invoked from cli.py
 # or __main__. Import here to keep the module self-contained.
 try:
-    from freshservice_client import FreshserviceClient
+    from freshservice_client import FreshserviceClient, print_lock as _print_lock
 except ImportError:
     import sys
     sys.path.insert(0, str(Path(__file__).parent))
-    from freshservice_client import FreshserviceClient
+    from freshservice_client import FreshserviceClient, print_lock as _print_lock
 
 
 SYNC_STATE_FILE = Path(__file__).parent / ".sync-state.json"
 
+# Assets synced between sync state writes in sync_all_assets. Freshservice
+# v2 has no bulk asset create/update endpoint, so each asset is still its
+# own request; periodic saves only bound how much progress a crash can lose
+# (the state is also saved when the run ends or is interrupted).
+SYNC_SAVE_EVERY = 50
+
+# Assets synced at once by sync_all_assets (1 = one after another). The
+# client backs off as Freshservice's per-minute rate limit runs low.
+FS_SYNC_CONCURRENCY = int(os.environ.get("FS_SYNC_CONCURRENCY", "8"))
+
+# Guards sync state updates from concurrent sync_single_asset calls against
+# save_sync_state merging and serializing the same dict
+_state_lock = threading.RLock()
+
+# Set ASSET_SYNC_FORCE=1 to re-send every asset, even ones whose payload
+# hash matches the last successful sync (see _payload_digest).
+ASSET_SYNC_FORCE = os.environ.get("ASSET_SYNC_FORCE", "").lower() in ("1", "true", "yes")
+
+# Hours a payload hash stays valid. Once it expires the asset is re-sent even
+# if unchanged, so edits made directly in Freshservice (a Missing state, a
+# hand-edited field) get overwritten with the collected data again.
+ASSET_SYNC_HASH_TTL = float(os.environ.get("ASSET_SYNC_HASH_TTL", "24"))
+
 # Freshservice IDs (override via environment variables)
 DEFAULT_AGENT_ID = int(os.environ.get("FRESHSERVICE_AGENT_ID", "7000348606"))
 IT_DEPARTMENT_ID = int(os.environ.get("FRESHSERVICE_DEPARTMENT_ID", "7000161748"))
@@ -98,18 +134,70 @@ VENDOR_MAP = {
 AVD_PREFIXES = ("avd-", "avd_", "avdwin")
 AVD_SUBSTRINGS = ("-cad-", "-esri-")
 
+# Both AVD pattern lists folded into one regex, so a hostname is checked in
+# a single scan instead of a startswith plus one `in` test per substring.
+_AVD_RE = re.compile("|".join(
+    ["^(?:" + "|".join(map(re.escape, AVD_PREFIXES)) + ")"] +
+    [re.escape(s) for s in AVD_SUBSTRINGS]))
+
+
+def _is_avd(hostname: str) -> bool:
+    """True if a lowercased hostname matches the AVD naming patterns."""
+    return _AVD_RE.search(hostname) is not None
+
+
+# Agent os_version substring -> (collection os_hint, label for skip messages),
+# checked in order by collect_from_all_tendrils.
+_OS_KINDS = (
+    ("windows", "windows", "Windows"),
+    ("vmkernel", "vmkernel", "ESXi"),
+    ("linux", "linux", "Linux"),
+)
+
+# Agents collected at once by collect_from_all_tendrils. Each collection
+# blocks on remote script execution (up to ~45s), so threads overlap the wait.
+TENDRIL_SYNC_CONCURRENCY = int(os.environ.get("TENDRIL_SYNC_CONCURRENCY", "16"))
+
+# Tendril server HTTP API, used when no tendril_execute_fn is passed in.
+# One pooled session keeps connections to the server alive across agents;
+# the pool is sized for TENDRIL_SYNC_CONCURRENCY collections at once.
+TENDRIL_EXECUTE_URL = "http://localhost:3000/api/v1/execute"
+_TENDRIL_SESSION = requests.Session()
+_TENDRIL_SESSION.mount("http://", HTTPAdapter(
+    pool_connections=1, pool_maxsize=max(TENDRIL_SYNC_CONCURRENCY, 1)))
+
+def _log(*lines: str):
+    """Print lines in one piece. _print_lock is the Freshservice client's, so
+    concurrent collections and its rate-limit notices don't interleave."""
+    with _print_lock:
+        print("\n".join(lines))
+
+
 # ── PowerShell collection script ────────────────────────────────────────
 # Runs on each Tendril agent to gather all VM info in one call.
+#
+# Each call costs one powershell.exe startup on the agent. Everything asset
+# sync needs (CIM, IMDS, registry tags) is deliberately kept in this single
+# script so that cost is paid once per agent per run. Tendril has no
+# persistent runspace to hand script bodies to, so splitting collection
+# into several scripts would multiply the startup cost instead.
 COLLECT_SCRIPT = r"""
 $ErrorActionPreference = 'SilentlyContinue'
 $info = @{}
 
 # ── WMI / CIM system info ──
-$os  = Get-CimInstance Win32_OperatingSystem
-$cs  = Get-CimInstance Win32_ComputerSystem
-$cpu = Get-CimInstance Win32_Processor | Select-Object -First 1
-$bios = Get-CimInstance Win32_BIOS
-$csp = Get-CimInstance Win32_ComputerSystemProduct
+# One local DCOM session shared by every CIM query below instead of a new
+# WMI connection per cmdlet. Falls back to per-call connections if the
+# session can't be opened.
+$cim = @{}
+$cimSession = New-CimSession -SessionOption (New-CimSessionOption -Protocol Dcom)
+if ($cimSession) { $cim.CimSession = $cimSession }
+
+$os  = Get-CimInstance Win32_OperatingSystem @cim
+$cs  = Get-CimInstance Win32_ComputerSystem @cim
+$cpu = Get-CimInstance Win32_Processor @cim | Select-Object -First 1
+$bios = Get-CimInstance Win32_BIOS @cim
+$csp = Get-CimInstance Win32_ComputerSystemProduct @cim
 
 $info.hostname       = $env:COMPUTERNAME
 $info.domain         = $cs.Domain
@@ -127,15 +215,16 @@ $info.manufacturer   = $csp.Vendor
 $info.is_vmware_guest = ($csp.Vendor -like '*VMware*') -or ($bios.SerialNumber -like '*VMware*')
 
 # C: drive size
-$disk = Get-CimInstance Win32_LogicalDisk -Filter "DeviceID='C:'"
+$disk = Get-CimInstance Win32_LogicalDisk -Filter "DeviceID='C:'" @cim
 $info.disk_gb = [math]::Round($disk.Size / 1GB, 0)
 
 # Primary IPv4
-$ip = (Get-NetIPAddress -AddressFamily IPv4 |
+$ip = (Get-NetIPAddress -AddressFamily IPv4 @cim |
        Where-Object { $_.InterfaceAlias -notmatch 'Loopback' -and
                       $_.IPAddress -notmatch '^169' } |
        Select-Object -First 1).IPAddress
 $info.ip_address = $ip
+if ($cimSession) { Remove-CimSession $cimSession }
 
 # ── Azure IMDS ──
 try {
@@ -173,87 +262,173 @@ $info | ConvertTo-Json -Depth 3
 """
 
 
+def _compact_ps(script: str) -> str:
+    """Strip comment lines, blank lines, indentation and `=` alignment."""
+    lines = (line.strip() for line in script.splitlines())
+    return "\n".join(re.sub(r" {2,}(?==)", " ", line) for line in lines
+                     if line and not line.startswith("#"))
+
+
+# What actually goes over the Tendril API for Windows agents, built once at
+# import: ~20% fewer bytes per agent than the commented COLLECT_SCRIPT.
+# -EncodedCommand would make it ~2.7x larger (UTF-16LE base64) and start a
+# second powershell.exe on the agent, so the plain text is sent.
+_COLLECT_SCRIPT_WIRE = _compact_ps(COLLECT_SCRIPT)
+
+
 # ── ESXi collection script ───────────────────────────────────────────────
-# Runs on ESXi/vmkernel agents via ash/sh shell.
+# Runs on ESXi/vmkernel agents via ash/sh shell. Each esxcli call costs a
+# few hundred ms, so they run in parallel into temp files; the raw output is
+# printed in ===SECTION=== blocks and parsed by _parse_esxi_blob().
 ESXI_COLLECT_SCRIPT = r"""
-hostname=$(hostname)
-cpu_model=$(esxcli hardware cpu global get 2>/dev/null | grep "Description" | sed 's/.*: //')
-cpu_cores=$(esxcli hardware cpu global get 2>/dev/null | grep "CPU Cores" | sed 's/.*: //')
-mem_bytes=$(esxcli hardware memory get 2>/dev/null | grep "Physical Memory" | sed 's/.*: //')
-mem_gb=$((mem_bytes / 1073741824))
-esxi_version=$(vmware -v 2>/dev/null || echo "unknown")
-uuid=$(esxcli system uuid get 2>/dev/null || echo "")
-serial=$(esxcli hardware platform get 2>/dev/null | grep "Serial Number" | sed 's/.*: //')
-manufacturer=$(esxcli hardware platform get 2>/dev/null | grep "Vendor Name" | sed 's/.*: //')
-model=$(esxcli hardware platform get 2>/dev/null | grep "Product Name" | sed 's/.*: //')
-ip=$(esxcli network ip interface ipv4 get 2>/dev/null | grep vmk0 | awk '{print $2}')
-
-cat <<ENDJSON
-{
-  "hostname": "$hostname",
-  "os_caption": "$esxi_version",
-  "os_version": "ESXi",
-  "cpu_name": "$cpu_model",
-  "cpu_cores": $cpu_cores,
-  "memory_gb": $mem_gb,
-  "serial_number": "$serial",
-  "uuid": "$uuid",
-  "manufacturer": "$manufacturer",
-  "model": "$model",
-  "ip_address": "$ip",
-  "is_azure": false,
-  "is_vmware_guest": false,
-  "is_esxi_host": true
-}
-ENDJSON
+t=/tmp/tendril-collect.$$
+mkdir -p $t
+esxcli hardware cpu global get > $t/CPU 2>/dev/null &
+esxcli hardware memory get > $t/MEMORY 2>/dev/null &
+esxcli hardware platform get > $t/PLATFORM 2>/dev/null &
+esxcli system uuid get > $t/UUID 2>/dev/null &
+esxcli network ip interface ipv4 get > $t/IPV4 2>/dev/null &
+wait
+echo "===HOSTNAME==="; hostname
+echo "===VERSION==="; vmware -v 2>/dev/null || echo "unknown"
+for s in CPU MEMORY PLATFORM UUID IPV4; do echo "===$s==="; cat $t/$s; done
+rm -rf $t
 """
 
 # ── Linux collection script ──────────────────────────────────────────────
-# Runs on Linux agents via bash/sh shell.
+# Runs on Linux agents via bash/sh shell. Prints raw ===SECTION=== blocks
+# for _parse_linux_blob() rather than piping each value through grep/cut/awk.
 LINUX_COLLECT_SCRIPT = r"""
-hostname=$(hostname)
-os_caption=$(cat /etc/os-release 2>/dev/null | grep PRETTY_NAME | cut -d'"' -f2)
-os_version=$(uname -r)
-cpu_name=$(grep "model name" /proc/cpuinfo 2>/dev/null | head -1 | cut -d: -f2 | xargs)
-cpu_cores=$(nproc 2>/dev/null || echo 1)
-mem_kb=$(grep MemTotal /proc/meminfo 2>/dev/null | awk '{print $2}')
-mem_gb=$((mem_kb / 1048576))
-disk_gb=$(df -BG / 2>/dev/null | tail -1 | awk '{print $2}' | tr -d 'G')
-uuid=$(cat /sys/class/dmi/id/product_uuid 2>/dev/null || echo "")
-serial=$(cat /sys/class/dmi/id/product_serial 2>/dev/null || echo "")
-manufacturer=$(cat /sys/class/dmi/id/sys_vendor 2>/dev/null || echo "")
-ip=$(hostname -I 2>/dev/null | awk '{print $1}')
-
-cat <<ENDJSON
-{
-  "hostname": "$hostname",
-  "os_caption": "$os_caption",
-  "os_version": "$os_version",
-  "cpu_name": "$cpu_name",
-  "cpu_cores": $cpu_cores,
-  "memory_gb": $mem_gb,
-  "disk_gb": $disk_gb,
-  "serial_number": "$serial",
-  "uuid": "$uuid",
-  "manufacturer": "$manufacturer",
-  "ip_address": "$ip",
-  "is_azure": false,
-  "is_vmware_guest": false
-}
-ENDJSON
+echo "===HOSTNAME==="; hostname
+echo "===OS_RELEASE==="; cat /etc/os-release 2>/dev/null
+echo "===KERNEL==="; uname -r
+echo "===CPU_NAME==="; grep -m1 "model name" /proc/cpuinfo 2>/dev/null
+echo "===CPU_CORES==="; nproc 2>/dev/null || echo 1
+echo "===MEMINFO==="; grep MemTotal /proc/meminfo 2>/dev/null
+echo "===DISK==="; df -BG / 2>/dev/null
+echo "===UUID==="; cat /sys/class/dmi/id/product_uuid 2>/dev/null
+echo "===SERIAL==="; cat /sys/class/dmi/id/product_serial 2>/dev/null
+echo "===VENDOR==="; cat /sys/class/dmi/id/sys_vendor 2>/dev/null
+echo "===IP==="; hostname -I 2>/dev/null
 """
 
+_SECTION_RE = re.compile(r"^===(\w+)===$", re.M)
+_FIELD_RE = re.compile(r"^\s*([^:\n]+?):[ \t]*(.*?)\s*$", re.M)
+_INT_RE = re.compile(r"\d+")
+
+
+def _split_sections(stdout: str) -> dict:
+    """Split ===NAME=== delimited script output into {NAME: body}."""
+    parts = _SECTION_RE.split(stdout)
+    if len(parts) < 3:
+        raise ValueError("no ===SECTION=== markers in collection output")
+    return {name: body.strip() for name, body in zip(parts[1::2], parts[2::2])}
+
+
+def _first_int(text: str) -> int | None:
+    m = _INT_RE.search(text or "")
+    return int(m.group()) if m else None
+
+
+def _parse_esxi_blob(stdout: str) -> dict:
+    """Build the ESXi host record from ESXI_COLLECT_SCRIPT output."""
+    sec = _split_sections(stdout)
+    cpu = dict(_FIELD_RE.findall(sec.get("CPU", "")))
+    platform = dict(_FIELD_RE.findall(sec.get("PLATFORM", "")))
+    mem = dict(_FIELD_RE.findall(sec.get("MEMORY", "")))
+    mem_bytes = _first_int(mem.get("Physical Memory", ""))
+
+    ip = ""
+    for line in sec.get("IPV4", "").splitlines():
+        cols = line.split()
+        if len(cols) > 1 and cols[0] == "vmk0":
+            ip = cols[1]
+            break
+
+    return {
+        "hostname": sec.get("HOSTNAME", ""),
+        "os_caption": sec.get("VERSION", "unknown"),
+        "os_version": "ESXi",
+        "cpu_name": cpu.get("Description", ""),
+        "cpu_cores": _first_int(cpu.get("CPU Cores", "")),
+        "memory_gb": mem_bytes // 1073741824 if mem_bytes is not None else None,
+        "serial_number": platform.get("Serial Number", ""),
+        "uuid": sec.get("UUID", ""),
+        "manufacturer": platform.get("Vendor Name", ""),
+        "model": platform.get("Product Name", ""),
+        "ip_address": ip,
+        "is_azure": False,
+        "is_vmware_guest": False,
+        "is_esxi_host": True,
+    }
+
+
+def _parse_linux_blob(stdout: str) -> dict:
+    """Build the Linux host record from LINUX_COLLECT_SCRIPT output."""
+    sec = _split_sections(stdout)
+    os_release = {}
+    for line in sec.get("OS_RELEASE", "").splitlines():
+        key, sep, value = line.partition("=")
+        if sep:
+            os_release[key.strip()] = value.strip().strip('"')
+    mem_kb = _first_int(sec.get("MEMINFO", ""))
+    disk_lines = sec.get("DISK", "").splitlines()
+    disk_cols = disk_lines[-1].split() if len(disk_lines) > 1 else []
+    ips = sec.get("IP", "").split()
+
+    return {
+        "hostname": sec.get("HOSTNAME", ""),
+        "os_caption": os_release.get("PRETTY_NAME", ""),
+        "os_version": sec.get("KERNEL", ""),
+        "cpu_name": sec.get("CPU_NAME", "").partition(":")[2].strip(),
+        "cpu_cores": _first_int(sec.get("CPU_CORES", "")) or 1,
+        "memory_gb": mem_kb // 1048576 if mem_kb is not None else None,
+        "disk_gb": _first_int(disk_cols[1]) if len(disk_cols) > 1 else None,
+        "serial_number": sec.get("SERIAL", ""),
+        "uuid": sec.get("UUID", ""),
+        "manufacturer": sec.get("VENDOR", ""),
+        "ip_address": ips[0] if ips else "",
+        "is_azure": False,
+        "is_vmware_guest": False,
+    }
+
 
 # ── Sync state helpers ──────────────────────────────────────────────────
 
 def load_sync_state() -> dict:
     if SYNC_STATE_FILE.exists():
+        if orjson is not None:
+            return orjson.loads(SYNC_STATE_FILE.read_bytes())
         return json.loads(SYNC_STATE_FILE.read_text())
     return {"changes": {}, "assets": {}}
 
 
+# Top-level .sync-state.json keys owned by asset sync. change_sync.py
+# ("changes") and cmdb_sync.py ("cmdb") share the file, and an asset run can
+# hold its state in memory for a long time, so saves merge into the file.
+_ASSET_STATE_KEYS = ("assets", "hashes")
+
+
 def save_sync_state(state: dict):
-    SYNC_STATE_FILE.write_text(json.dumps(state, indent=2))
+    """Write asset sync state into .sync-state.json.
+
+    Re-reads the file and replaces only the _ASSET_STATE_KEYS sections, so
+    entries other tools wrote since `state` was loaded are kept. The write
+    is atomic (temp file + rename), so a crash mid-write can't leave a
+    truncated file behind.
+    """
+    with _state_lock:
+        merged = load_sync_state()
+        for key in _ASSET_STATE_KEYS:
+            if key in state:
+                merged[key] = state[key]
+        if orjson is not None:
+            data = orjson.dumps(merged, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        else:
+            data = json.dumps(merged, indent=2).encode()
+        tmp = SYNC_STATE_FILE.with_suffix(".json.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, SYNC_STATE_FILE)
 
 
 # ── Tendril data collection ────────────────────────────────────────────
@@ -269,46 +444,39 @@ def collect_from_tendril(hostname: str, tendril_execute_fn=None,
       - "linux" -> LINUX_COLLECT_SCRIPT
 
     If tendril_execute_fn is provided (MCP tool function), use it directly.
-    Otherwise, fall back to calling the Tendril HTTP API via curl.
+    Otherwise, fall back to calling the Tendril HTTP API directly.
     """
     if "vmkernel" in os_hint:
-        script = ESXI_COLLECT_SCRIPT
+        script, parse = ESXI_COLLECT_SCRIPT, _parse_esxi_blob
     elif "linux" in os_hint:
-        script = LINUX_COLLECT_SCRIPT
+        script, parse = LINUX_COLLECT_SCRIPT, _parse_linux_blob
     else:
-        script = COLLECT_SCRIPT
+        script, parse = _COLLECT_SCRIPT_WIRE, json.loads
 
     if tendril_execute_fn:
         result = tendril_execute_fn(agent=hostname, script=script, timeout=30)
         if isinstance(result, dict) and result.get("success"):
             try:
-                return json.loads(result["stdout"])
-            except json.JSONDecodeError:
-                print(f"  WARNING: Could not parse JSON from {hostname}")
-                print(f"  stdout: {result['stdout'][:300]}")
+                return parse(result["stdout"])
+            except ValueError:
+                _log(f"  WARNING: Could not parse collection output from {hostname}",
+                     f"  stdout: {result['stdout'][:300]}")
                 return {}
         else:
             error = result.get("stderr", "") if isinstance(result, dict) else str(result)
-            print(f"  ERROR collecting from {hostname}: {error[:200]}")
+            _log(f"  ERROR collecting from {hostname}: {error[:200]}")
             return {}
     else:
         try:
-            proc = subprocess.run(
-                ["curl", "-s", "-X", "POST",
-                 "http://localhost:3000/api/v1/execute",
-                 "-H", "Content-Type: application/json",
-                 "-d", json.dumps({
-                     "agent": hostname,
-                     "script": script,
-                     "timeout": 30
-                 })],
-                capture_output=True, text=True, timeout=45
-            )
-            resp = json.loads(proc.stdout)
+            resp = _TENDRIL_SESSION.post(TENDRIL_EXECUTE_URL, json={
+                "agent": hostname,
+                "script": script,
+                "timeout": 30,
+            }, timeout=45).json()
             if resp.get("success"):
-                return json.loads(resp["stdout"])
+                return parse(resp["stdout"])
         except Exception as e:
-            print(f"  ERROR collecting from {hostname} via curl: {e}")
+            _log(f"  ERROR collecting from {hostname} via Tendril API: {e}")
         return {}
 
 
@@ -317,64 +485,79 @@ def collect_from_all_tendrils(tendril_list: list, tendril_execute_fn=None,
                                windows_only: bool = False) -> dict:
     """
     Collect data from all connected Tendril agents.
-    Returns dict of hostname -> collected data.
+    Returns dict of hostname -> collected data, in tendril_list order.
 
     Uses the appropriate collection script based on agent OS:
       - Windows agents -> PowerShell COLLECT_SCRIPT
       - ESXi agents -> ESXI_COLLECT_SCRIPT
       - Linux agents -> LINUX_COLLECT_SCRIPT
 
-    Skips bridge containers and mobile devices.
+    Skips bridge containers and mobile devices. The remaining agents are
+    collected TENDRIL_SYNC_CONCURRENCY at a time (1 = one after another).
     """
-    results = {}
-    for i, agent in enumerate(tendril_list):
+    total = len(tendril_list)
+    targets = []
+    for i, agent in enumerate(tendril_list, 1):
         hostname = agent["hostname"].lower()
         os_version = agent.get("os_version", "")
 
         # Skip bridge containers
         if hostname in BRIDGE_HOSTNAMES:
-            print(f"  [{i+1}/{len(tendril_list)}] Skipping bridge: {hostname}")
+            print(f"  [{i}/{total}] Skipping bridge: {hostname}")
             continue
 
         # Skip Android devices
         if "android" in os_version:
-            print(f"  [{i+1}/{len(tendril_list)}] Skipping mobile: {hostname}")
+            print(f"  [{i}/{total}] Skipping mobile: {hostname}")
             continue
 
-        if skip_avd and (hostname.startswith(AVD_PREFIXES) or
-                         any(s in hostname for s in AVD_SUBSTRINGS)):
-            print(f"  [{i+1}/{len(tendril_list)}] Skipping AVD: {hostname}")
+        if skip_avd and _is_avd(hostname):
+            print(f"  [{i}/{total}] Skipping AVD: {hostname}")
             continue
 
         # Determine OS hint for script selection
-        if "windows" in os_version:
-            os_hint = "windows"
-        elif "vmkernel" in os_version:
-            if windows_only:
-                print(f"  [{i+1}/{len(tendril_list)}] Skipping ESXi: {hostname}")
-                continue
-            os_hint = "vmkernel"
-        elif "linux" in os_version:
-            if windows_only:
-                print(f"  [{i+1}/{len(tendril_list)}] Skipping Linux: {hostname}")
-                continue
-            os_hint = "linux"
-        else:
-            print(f"  [{i+1}/{len(tendril_list)}] Skipping unknown OS: {hostname} ({os_version})")
+        os_hint, label = next(((hint, label) for kw, hint, label in _OS_KINDS
+                               if kw in os_version), (None, None))
+        if os_hint is None:
+            print(f"  [{i}/{total}] Skipping unknown OS: {hostname} ({os_version})")
+            continue
+        if windows_only and os_hint != "windows":
+            print(f"  [{i}/{total}] Skipping {label}: {hostname}")
             continue
 
-        print(f"  [{i+1}/{len(tendril_list)}] Collecting from {hostname} ({os_hint})...")
-        data = collect_from_tendril(hostname, tendril_execute_fn, os_hint=os_hint)
-        if data:
-            results[hostname] = data
-        else:
-            print(f"    (no data returned)")
+        targets.append((hostname, os_hint))
 
-    return results
+    if not targets:
+        return {}
+
+    workers = max(1, min(TENDRIL_SYNC_CONCURRENCY, len(targets)))
+    print(f"  Collecting from {len(targets)} agents ({workers} at a time)...")
+    collected = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(collect_from_tendril, hostname, tendril_execute_fn,
+                        os_hint=os_hint): (hostname, os_hint)
+            for hostname, os_hint in targets
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            hostname, os_hint = futures[future]
+            data = future.result()
+            if data:
+                data["_hostname_lc"] = (data.get("hostname") or "").lower()
+                collected[hostname] = data
+                _log(f"  [{done}/{len(targets)}] {hostname} ({os_hint}): OK")
+            else:
+                _log(f"  [{done}/{len(targets)}] {hostname} ({os_hint}): no data returned")
+
+    return {hostname: collected[hostname] for hostname, _ in targets
+            if hostname in collected}
 
 
 # ── Freshservice payload mapping ────────────────────────────────────────
+# The string mappers below are pure and see the same few dozen captions,
+# lifecycle tags and IPs over and over across a fleet, so they're memoized.
 
+@lru_cache(maxsize=128)
 def _map_os_choice(os_caption: str) -> str:
     """Map WMI OS caption to a Freshservice OS dropdown value."""
     if not os_caption:
@@ -395,6 +578,7 @@ def _map_os_choice(os_caption: str) -> str:
     return os_caption
 
 
+@lru_cache(maxsize=128)
 def _map_lifecycle_to_status(lifecycle: str) -> str:
     """Map Azure Lifecycle tag to Freshservice Server Status dropdown."""
     if not lifecycle:
@@ -444,6 +628,7 @@ def _build_description(data: dict) -> str:
     return "\n".join(parts)
 
 
+@lru_cache(maxsize=128)
 def _classify_network(ip: str) -> str:
     """Classify IP into a network segment for the Freshservice Network dropdown.
 
@@ -467,6 +652,15 @@ def _classify_network(ip: str) -> str:
 
 # ── Asset type auto-classification ──────────────────────────────────────
 
+def _hostname_lc(data: dict) -> str:
+    """Lowercased data["hostname"]; collect_from_all_tendrils stores it on
+    each record as _hostname_lc so it's only computed once per agent."""
+    lc = data.get("_hostname_lc")
+    if lc is None:
+        lc = (data.get("hostname") or "").lower()
+    return lc
+
+
 def classify_asset_type(data: dict) -> int:
     """
     Determine the correct Freshservice asset type ID based on collected data.
@@ -474,15 +668,14 @@ def classify_asset_type(data: dict) -> int:
     Returns one of: AZURE_VM_TYPE_ID, VMWARE_VM_TYPE_ID, VMWARE_HOST_TYPE_ID,
                      SERVER_TYPE_ID.
     """
-    hostname = (data.get("hostname") or "").lower()
+    hostname = _hostname_lc(data)
 
     # ESXi hosts
     if data.get("is_esxi_host"):
         return VMWARE_HOST_TYPE_ID
 
     # AVD desktops are Azure VMs
-    if (hostname.startswith(AVD_PREFIXES) or
-            any(s in hostname for s in AVD_SUBSTRINGS)):
+    if _is_avd(hostname):
         return AZURE_VM_TYPE_ID
 
     # Azure IMDS detected
@@ -509,19 +702,21 @@ def classify_asset_type(data: dict) -> int:
     return SERVER_TYPE_ID
 
 
+_TYPE_LABELS = {
+    AZURE_VM_TYPE_ID: "Azure VM",
+    VMWARE_VM_TYPE_ID: "VMware VCenter VM",
+    VMWARE_HOST_TYPE_ID: "VMware VCenter Host",
+    SERVER_TYPE_ID: "Server",
+}
+
+
 def _type_id_label(type_id: int) -> str:
     """Human-readable label for an asset type ID."""
-    labels = {
-        AZURE_VM_TYPE_ID: "Azure VM",
-        VMWARE_VM_TYPE_ID: "VMware VCenter VM",
-        VMWARE_HOST_TYPE_ID: "VMware VCenter Host",
-        SERVER_TYPE_ID: "Server",
-    }
-    return labels.get(type_id, str(type_id))
+    return _TYPE_LABELS.get(type_id, str(type_id))
 
 
 # Known Freshservice Instance Type dropdown values (for validation)
-_KNOWN_INSTANCE_TYPES = {
+_KNOWN_INSTANCE_TYPES = frozenset({
     "Standard_D2s_v3", "Standard_B2ms", "Standard_D4s_v3", "Standard_B2s",
     "Standard_B4ms", "Standard_F4s_v2", "Standard_D8s_v3",
     "Standard_D2as_v4", "Standard_DS1_v2", "Standard_DS3_v2",
@@ -531,6 +726,47 @@ _KNOWN_INSTANCE_TYPES = {
     "Standard_D4as_v5", "Standard_D2as_v5", "Standard_B1s",
     "Standard_D4ds_v5", "Standard_D2ds_v5",
     "Microsoft.Compute/virtualMachines",
+})
+
+
+# ── type_fields templates ──
+# Static type_fields values, merged into each payload instead of being
+# rebuilt (and, for VMware hosts, stripped again) on every call.
+_COMMON_TYPE_FIELDS = {
+    "compute_type_7001129940": "Virtual",
+    "asset_state_7001129940": "In Use",
+    "state_7001129946": "Running",
+}
+
+# Server section (_7001129968 fields). The VMware VCenter Host type does NOT
+# have these, so they're only added for the other types.
+_SERVER_SECTION_FIELDS = {
+    "datacenter_7001129968": "IT",
+    "veeam_backup_7001129968": "!",
+    "gfi_languard_agent_7001129968": "!",
+    "cbdefense_agent_7001129968": "!",
+    "unique_admin_password_7001129968": "N/A",
+}
+
+_TYPE_TEMPLATES = {
+    AZURE_VM_TYPE_ID: {
+        "virtual_subtype_7001129940": "Azure Cloud Service",
+        "product_7001129940": PRODUCT_AZURE_VM_ID,
+        "provider_type_7001129946": "AZURE",
+    },
+    VMWARE_VM_TYPE_ID: {
+        "product_7001129940": PRODUCT_VMWARE_VM_ID,
+        "virtual_subtype_7001129940": "Internal VM",
+        "provider_type_7001129946": "VMWARE VCENTER",
+    },
+    VMWARE_HOST_TYPE_ID: {
+        "product_7001129940": PRODUCT_VMWARE_HOST_ID,
+        "compute_type_7001129940": "Physical",
+    },
+    SERVER_TYPE_ID: {
+        "product_7001129940": PRODUCT_VIRTUAL_MACHINE_ID,
+        "provider_type_7001129946": "VMWARE VCENTER",
+    },
 }
 
 
@@ -541,98 +777,72 @@ def build_asset_payload(data: dict, force_type_id: int = None) -> dict:
     Auto-classifies the asset type unless force_type_id is provided.
     Builds type_fields appropriate for the detected type.
     """
-    hostname = (data.get("hostname") or "").upper()
-    vm_size = data.get("vm_size", "")
+    g = data.get
+    hostname = (g("hostname") or "").upper()
+    vm_size = g("vm_size", "")
+    ip_address = g("ip_address", "")
+    uuid = g("uuid", "")
     asset_type_id = force_type_id or classify_asset_type(data)
 
     # ── Common type_fields (shared across all server types) ──
     # Freshservice requires integer values for disk_space and memory
-    disk_gb = data.get("disk_gb")
+    disk_gb = g("disk_gb")
     if disk_gb is not None:
         disk_gb = int(disk_gb)
-    memory_gb = data.get("memory_gb")
+    memory_gb = g("memory_gb")
     if memory_gb is not None:
         memory_gb = int(memory_gb)
 
     type_fields = {
+        **_COMMON_TYPE_FIELDS,
+
         # Hardware section
-        "compute_type_7001129940": "Virtual",
-        "domain_7001129940": data.get("domain", ""),
-        "asset_state_7001129940": "In Use",
-        "serial_number_7001129940": data.get("uuid") or data.get("serial_number") or data.get("hostname", ""),
+        "domain_7001129940": g("domain", ""),
+        "serial_number_7001129940": uuid or g("serial_number") or g("hostname", ""),
 
         # Computer section
-        "os_7001129946": _map_os_choice(data.get("os_caption", "")),
-        "os_version_7001129946": data.get("os_version", ""),
+        "os_7001129946": _map_os_choice(g("os_caption", "")),
+        "os_version_7001129946": g("os_version", ""),
         "memory_7001129946": memory_gb,
         "disk_space_7001129946": disk_gb if disk_gb is not None else 0,
-        "cpu_speed_7001129946": data.get("cpu_speed_ghz") or 0,
-        "cpu_core_count_7001129946": data.get("cpu_cores"),
-        "uuid_7001129946": data.get("uuid", ""),
+        "cpu_speed_7001129946": g("cpu_speed_ghz") or 0,
+        "cpu_core_count_7001129946": g("cpu_cores"),
+        "uuid_7001129946": uuid,
         "hostname_7001129946": hostname,
-        "computer_ip_address_7001129946": data.get("ip_address", ""),
-        "state_7001129946": "Running",
-
-        # Server section
-        "status_7001129968": _map_lifecycle_to_status(
-            data.get("tag_lifecycle", "")),
-        "datacenter_7001129968": "IT",
-        "network_7001129968": _classify_network(
-            data.get("ip_address", "")),
-        "veeam_backup_7001129968": "!",
-        "gfi_languard_agent_7001129968": "!",
-        "cbdefense_agent_7001129968": "!",
-        "unique_admin_password_7001129968": "N/A",
-        "notes_7001129968": (
-            f"Application: {data.get('tag_application', 'N/A')}\n"
-            f"Vendor: {data.get('tag_vendor', 'N/A')}\n"
-            f"Server Type: {data.get('tag_server_type', 'N/A')}\n"
-            f"Resource Group: {data.get('resource_group', 'N/A')}"
-        ),
+        "computer_ip_address_7001129946": ip_address,
     }
 
+    # ── Server section ──
+    if asset_type_id != VMWARE_HOST_TYPE_ID:
+        type_fields.update(_SERVER_SECTION_FIELDS)
+        type_fields["status_7001129968"] = _map_lifecycle_to_status(g("tag_lifecycle", ""))
+        type_fields["network_7001129968"] = _classify_network(ip_address)
+        type_fields["notes_7001129968"] = (
+            f"Application: {g('tag_application', 'N/A')}\n"
+            f"Vendor: {g('tag_vendor', 'N/A')}\n"
+            f"Server Type: {g('tag_server_type', 'N/A')}\n"
+            f"Resource Group: {g('resource_group', 'N/A')}"
+        )
+
     # ── Type-specific fields ──
+    template = _TYPE_TEMPLATES.get(asset_type_id)
+    if template:
+        type_fields.update(template)
+
     if asset_type_id == AZURE_VM_TYPE_ID:
+        # Azure VM section
         type_fields.update({
-            "virtual_subtype_7001129940": "Azure Cloud Service",
-            "product_7001129940": PRODUCT_AZURE_VM_ID,
-            "provider_type_7001129946": "AZURE",
-            # Azure VM section
-            "resource_uri_7001431713": data.get("resource_uri", ""),
-            "subscription_id_7001431713": data.get("subscription_id", ""),
-            "publisher_7001431713": data.get("publisher", ""),
-            "offer_7001431713": data.get("offer", ""),
-            "sku_7001431713": data.get("sku", ""),
-            "os_disk_name_7001431713": data.get("os_disk_name", ""),
+            "resource_uri_7001431713": g("resource_uri", ""),
+            "subscription_id_7001431713": g("subscription_id", ""),
+            "publisher_7001431713": g("publisher", ""),
+            "offer_7001431713": g("offer", ""),
+            "sku_7001431713": g("sku", ""),
+            "os_disk_name_7001431713": g("os_disk_name", ""),
             "computer_name_7001431713": hostname,
         })
         if vm_size in _KNOWN_INSTANCE_TYPES:
             type_fields["cd_instance_type_7001129946"] = vm_size
 
-    elif asset_type_id == VMWARE_VM_TYPE_ID:
-        type_fields.update({
-            "product_7001129940": PRODUCT_VMWARE_VM_ID,
-            "virtual_subtype_7001129940": "Internal VM",
-            "provider_type_7001129946": "VMWARE VCENTER",
-        })
-
-    elif asset_type_id == VMWARE_HOST_TYPE_ID:
-        type_fields.update({
-            "product_7001129940": PRODUCT_VMWARE_HOST_ID,
-            "compute_type_7001129940": "Physical",
-        })
-        # VMware VCenter Host type does NOT have Server-section fields.
-        # Remove any _7001129968 fields that were set in common section.
-        keys_to_remove = [k for k in type_fields if k.endswith("_7001129968")]
-        for k in keys_to_remove:
-            del type_fields[k]
-
-    elif asset_type_id == SERVER_TYPE_ID:
-        type_fields.update({
-            "product_7001129940": PRODUCT_VIRTUAL_MACHINE_ID,
-            "provider_type_7001129946": "VMWARE VCENTER",
-        })
-
     payload = {
         "name": hostname,
         "asset_type_id": asset_type_id,
@@ -662,26 +872,18 @@ def _normalize_hostname(hostname: str) -> str:
 def find_existing_asset(client: FreshserviceClient, hostname: str) -> dict | None:
     """Search for an existing asset by hostname (name field).
 
-    Tries the exact name, upper/lower variants, and FQDN-stripped forms.
+    Tries the FQDN-stripped short name, then the FQDN. Freshservice name
+    queries match case-insensitively, so upper/lower variants of the same
+    name aren't queried separately.
     """
-    # Build list of name variants to try
-    variants = [hostname, hostname.upper(), hostname.lower()]
-
-    # Add FQDN-stripped variant if hostname contains a domain
     short = _normalize_hostname(hostname)
-    if short != hostname.lower():
-        variants.extend([short, short.upper()])
-
-    # Add FQDN variant if hostname is short
-    if "." not in hostname:
+    if "." in hostname:
+        fqdn = hostname.lower()
+    else:
         domain_suffix = os.environ.get("FRESHSERVICE_DOMAIN_SUFFIX", ".example.local")
-        variants.append(f"{hostname.lower()}{domain_suffix}")
+        fqdn = f"{short}{domain_suffix}"
 
-    seen = set()
-    for variant in variants:
-        if variant in seen:
-            continue
-        seen.add(variant)
+    for variant in dict.fromkeys((short, fqdn)):
         resp = client.get("assets", params={
             "query": f"\"name:'{variant}'\"",
         })
@@ -692,63 +894,150 @@ def find_existing_asset(client: FreshserviceClient, hostname: str) -> dict | Non
     return None
 
 
+def build_asset_index(client: FreshserviceClient) -> dict:
+    """Fetch all assets once and index them by normalized hostname.
+
+    Lets a sync run resolve unknown hostnames with a dict lookup instead of
+    up to two name queries per host (see find_existing_asset). The first
+    asset listed wins when several normalize to the same name.
+    """
+    index = {}
+    for asset in client.list_assets():
+        name = asset.get("name")
+        if name:
+            index.setdefault(_normalize_hostname(name), asset)
+    return index
+
+
+def _payload_digest(payload: dict) -> str:
+    """Stable short hash of an asset payload, used to skip unchanged updates."""
+    if orjson is not None:
+        raw = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+    else:
+        raw = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+def _hash_is_current(entry, digest: str) -> bool:
+    """True if a state["hashes"] entry ([digest, synced_at]) matches digest
+    and is younger than ASSET_SYNC_HASH_TTL."""
+    if not isinstance(entry, list) or len(entry) != 2:
+        return False
+    return entry[0] == digest and time.time() - entry[1] < ASSET_SYNC_HASH_TTL * 3600
+
+
 def sync_single_asset(client: FreshserviceClient, data: dict,
-                       dry_run: bool = False) -> dict:
+                       dry_run: bool = False, state: dict = None,
+                       index: dict = None, heading: str = None) -> dict:
     """
     Create or update a single asset in Freshservice.
     Returns the Freshservice asset response or dry-run summary.
+
+    When state is passed in, new hostname -> display_id mappings are recorded
+    in it and the caller is responsible for save_sync_state(); otherwise the
+    sync state file is loaded and saved here.
+
+    index (from build_asset_index) is checked before querying Freshservice
+    for hostnames not yet in the sync state.
+
+    A hash of each successfully sent payload is kept in state["hashes"];
+    known assets whose payload hasn't changed since their last sync are
+    skipped, unless ASSET_SYNC_FORCE is set or the hash is older than
+    ASSET_SYNC_HASH_TTL.
+
+    Progress lines (preceded by heading, if given) are buffered and written
+    in one piece when the asset is done, so concurrent syncs don't
+    interleave their output.
     """
+    log = [heading] if heading else []
+    try:
+        return _sync_asset(client, data, dry_run, state, index, log.append)
+    finally:
+        if log:
+            _log(*log)
+
+
+def _sync_asset(client: FreshserviceClient, data: dict, dry_run: bool,
+                state: dict | None, index: dict | None, out) -> dict:
+    """sync_single_asset's body; progress lines are passed to out()."""
     payload = build_asset_payload(data)
     hostname = payload["name"]
+    hostname_lc = _hostname_lc(data)
     asset_type_id = payload["asset_type_id"]
     type_label = _type_id_label(asset_type_id)
-    state = load_sync_state()
+    owns_state = state is None
+    if owns_state:
+        state = load_sync_state()
 
     # Check sync state first
-    existing_display_id = state.get("assets", {}).get(hostname.lower())
+    existing_display_id = state.get("assets", {}).get(hostname_lc)
 
     if dry_run:
-        print(f"\n  DRY RUN: {hostname}")
-        print(f"    Type:     {type_label}")
-        print(f"    OS:       {data.get('os_caption', '?')}")
-        print(f"    IP:       {data.get('ip_address', '?')}")
-        print(f"    VM Size:  {data.get('vm_size', '?')}")
-        print(f"    Memory:   {data.get('memory_gb', '?')} GB")
-        print(f"    App:      {data.get('tag_application', '?')}")
-        print(f"    VMware:   {data.get('is_vmware_guest', '?')}")
-        print(f"    Existing: {'#' + str(existing_display_id) if existing_display_id else 'NEW'}")
+        out(f"\n  DRY RUN: {hostname}")
+        out(f"    Type:     {type_label}")
+        out(f"    OS:       {data.get('os_caption', '?')}")
+        out(f"    IP:       {data.get('ip_address', '?')}")
+        out(f"    VM Size:  {data.get('vm_size', '?')}")
+        out(f"    Memory:   {data.get('memory_gb', '?')} GB")
+        out(f"    App:      {data.get('tag_application', '?')}")
+        out(f"    VMware:   {data.get('is_vmware_guest', '?')}")
+        out(f"    Existing: {'#' + str(existing_display_id) if existing_display_id else 'NEW'}")
         return {"dry_run": True, "hostname": hostname, "payload": payload}
 
+    digest = _payload_digest(payload)
+    with _state_lock:
+        hashes = state.setdefault("hashes", {})
+
     if existing_display_id:
-        print(f"    Updating existing {type_label} #{existing_display_id}...")
+        if not ASSET_SYNC_FORCE and _hash_is_current(hashes.get(hostname_lc), digest):
+            out(f"    Unchanged: #{existing_display_id}")
+            return {"unchanged": True, "hostname": hostname,
+                    "display_id": existing_display_id}
+        out(f"    Updating existing {type_label} #{existing_display_id}...")
         update_payload = dict(payload)
         update_payload.pop("asset_type_id", None)
         result = client.update_asset(existing_display_id, update_payload)
         asset = result.get("asset", result)
-        print(f"    Updated: #{asset.get('display_id', existing_display_id)}")
+        if "error" not in result:
+            with _state_lock:
+                hashes[hostname_lc] = [digest, time.time()]
+            if owns_state:
+                save_sync_state(state)
+        out(f"    Updated: #{asset.get('display_id', existing_display_id)}")
     else:
-        existing = find_existing_asset(client, hostname)
+        existing = None
+        if index is not None:
+            existing = index.get(_normalize_hostname(hostname))
+        if existing is None:
+            existing = find_existing_asset(client, hostname)
         if existing:
             display_id = existing["display_id"]
-            print(f"    Found existing asset #{display_id}, updating as {type_label}...")
+            out(f"    Found existing asset #{display_id}, updating as {type_label}...")
             update_payload = dict(payload)
             update_payload.pop("asset_type_id", None)
             result = client.update_asset(display_id, update_payload)
             asset = result.get("asset", result)
-            state.setdefault("assets", {})[hostname.lower()] = display_id
-            save_sync_state(state)
-            print(f"    Updated: #{display_id}")
+            with _state_lock:
+                state.setdefault("assets", {})[hostname_lc] = display_id
+                if "error" not in result:
+                    hashes[hostname_lc] = [digest, time.time()]
+            if owns_state:
+                save_sync_state(state)
+            out(f"    Updated: #{display_id}")
         else:
-            print(f"    Creating new {type_label} asset...")
+            out(f"    Creating new {type_label} asset...")
             result = client.create_asset(payload)
             asset = result.get("asset", {})
             display_id = asset.get("display_id")
             if display_id:
-                print(f"    Created: #{display_id}")
-                state.setdefault("assets", {})[hostname.lower()] = display_id
-                save_sync_state(state)
+                out(f"    Created: #{display_id}")
+                with _state_lock:
+                    state.setdefault("assets", {})[hostname_lc] = display_id
+                    hashes[hostname_lc] = [digest, time.time()]
+                if owns_state:
+                    save_sync_state(state)
             else:
-                print(f"    ERROR: {result}")
+                out(f"    ERROR: {result}")
 
     return result
 
@@ -758,13 +1047,59 @@ def sync_all_assets(client: FreshserviceClient, collected_data: dict,
     """
     Sync all collected agent data to Freshservice.
     collected_data: dict of hostname -> collected data from Tendril.
+
+    The sync state is loaded once, written back every SYNC_SAVE_EVERY
+    assets, and flushed when the run finishes or is interrupted (Ctrl-C).
+    Existing assets are looked up in an index built at the start of each run.
+    Real syncs run FS_SYNC_CONCURRENCY assets at a time; results are
+    returned in hostname order either way.
     """
-    results = []
-    total = len(collected_data)
-    for i, (hostname, data) in enumerate(sorted(collected_data.items())):
-        print(f"\n  [{i+1}/{total}] {hostname}")
-        result = sync_single_asset(client, data, dry_run=dry_run)
-        results.append(result)
+    state = load_sync_state()
+    items = sorted(collected_data.items())
+    total = len(items)
+
+    # One listing of all assets replaces per-host name lookups, but is only
+    # worth fetching when some host has no display_id in the sync state yet.
+    index = None
+    known = state.get("assets", {})
+    if not dry_run and any(
+            _hostname_lc(data) not in known
+            for _, data in items):
+        print("  Indexing existing Freshservice assets...")
+        index = build_asset_index(client)
+        print(f"  Indexed {len(index)} assets")
+
+    def sync_one(i, hostname, data):
+        return sync_single_asset(client, data, dry_run=dry_run,
+                                 state=state, index=index,
+                                 heading=f"\n  [{i}/{total}] {hostname}")
+
+    workers = 1 if dry_run else max(1, min(FS_SYNC_CONCURRENCY, total))
+    results = [None] * total
+    try:
+        if workers == 1:
+            for i, (hostname, data) in enumerate(items, 1):
+                results[i - 1] = sync_one(i, hostname, data)
+                if not dry_run and i % SYNC_SAVE_EVERY == 0:
+                    save_sync_state(state)
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = {
+                    pool.submit(sync_one, i, hostname, data): i
+                    for i, (hostname, data) in enumerate(items, 1)
+                }
+                try:
+                    for done, future in enumerate(as_completed(futures), 1):
+                        results[futures[future] - 1] = future.result()
+                        if done % SYNC_SAVE_EVERY == 0:
+                            save_sync_state(state)
+                except BaseException:
+                    for future in futures:
+                        future.cancel()
+                    raise
+    finally:
+        if not dry_run:
+            save_sync_state(state)
     return results
 
 
@@ -781,8 +1116,15 @@ def show_asset_sync_status():
 # ── Retirement marking ──────────────────────────────────────────────────
 
 def mark_asset_retired(client: FreshserviceClient, display_id: int,
-                       hostname: str, dry_run: bool = False) -> bool:
-    """Mark an asset as retired/missing in Freshservice."""
+                       hostname: str, dry_run: bool = False,
+                       state: dict = None) -> bool:
+    """
+    Mark an asset as retired/missing in Freshservice.
+
+    The host's payload hash is dropped from the sync state, so if it comes
+    back the next sync re-sends it and clears the Missing state. When state
+    is passed in the caller is responsible for save_sync_state().
+    """
     if dry_run:
         print(f"    DRY RUN: Would mark #{display_id} ({hostname}) as Missing")
         return True
@@ -797,6 +1139,14 @@ def mark_asset_retired(client: FreshserviceClient, display_id: int,
         print(f"      ERROR: {str(result.get('error', ''))[:200]}")
         return False
 
+    owns_state = state is None
+    if owns_state:
+        state = load_sync_state()
+    with _state_lock:
+        state.get("hashes", {}).pop(hostname.lower(), None)
+    if owns_state:
+        save_sync_state(state)
+
     print(f"      Marked as Missing")
     return True
 
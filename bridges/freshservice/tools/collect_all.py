@@ -26,25 +26,34 @@ Usage:
 """
 
 import json
-import subprocess
 import sys
 import time
 import os
 from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+import requests
+from requests.adapters import HTTPAdapter
+
 TENDRIL_API = os.getenv("TENDRIL_API", "http://localhost:3000")
 OUTPUT_FILE = Path(__file__).parent / ".collected-assets.json"
 
+# Shared keep-alive connection pool to the Tendril server for all workers
+_SESSION = requests.Session()
+_SESSION.mount(TENDRIL_API, HTTPAdapter(pool_connections=1, pool_maxsize=32))
+
 # Compact version of the collection script
 COLLECT_SCRIPT = r"""
 $ErrorActionPreference = 'SilentlyContinue'
 $info = @{}
-$os  = Get-CimInstance Win32_OperatingSystem
-$cs  = Get-CimInstance Win32_ComputerSystem
-$cpu = Get-CimInstance Win32_Processor | Select-Object -First 1
-$bios = Get-CimInstance Win32_BIOS
-$csp = Get-CimInstance Win32_ComputerSystemProduct
+$cim = @{}
+$cimSession = New-CimSession -SessionOption (New-CimSessionOption -Protocol Dcom)
+if ($cimSession) { $cim.CimSession = $cimSession }
+$os  = Get-CimInstance Win32_OperatingSystem @cim
+$cs  = Get-CimInstance Win32_ComputerSystem @cim
+$cpu = Get-CimInstance Win32_Processor @cim | Select-Object -First 1
+$bios = Get-CimInstance Win32_BIOS @cim
+$csp = Get-CimInstance Win32_ComputerSystemProduct @cim
 $info.hostname       = $env:COMPUTERNAME
 $info.domain         = $cs.Domain
 $info.os_caption     = $os.Caption
@@ -54,10 +63,11 @@ $info.cpu_cores      = $cpu.NumberOfCores
 $info.cpu_speed_ghz  = [math]::Round($cpu.MaxClockSpeed / 1000, 2)
 $info.serial_number  = $bios.SerialNumber
 $info.uuid           = $csp.UUID
-$disk = Get-CimInstance Win32_LogicalDisk -Filter "DeviceID='C:'"
+$disk = Get-CimInstance Win32_LogicalDisk -Filter "DeviceID='C:'" @cim
 $info.disk_gb = [math]::Round($disk.Size / 1GB, 0)
-$ip = (Get-NetIPAddress -AddressFamily IPv4 | Where-Object { $_.InterfaceAlias -notmatch 'Loopback' -and $_.IPAddress -notmatch '^169' } | Select-Object -First 1).IPAddress
+$ip = (Get-NetIPAddress -AddressFamily IPv4 @cim | Where-Object { $_.InterfaceAlias -notmatch 'Loopback' -and $_.IPAddress -notmatch '^169' } | Select-Object -First 1).IPAddress
 $info.ip_address = $ip
+if ($cimSession) { Remove-CimSession $cimSession }
 try {
     $headers = @{ "Metadata" = "true" }
     $imds = Invoke-RestMethod -Uri "http://169.254.169.254/metadata/instance?api-version=2021-12-13" -Headers $headers -TimeoutSec 3
@@ -77,11 +87,7 @@ SKIP_HOSTNAMES = {"avd-esri-0", "avd-0", "avd-1", "avdwin11-0", "avdwin11-1"}
 
 def get_connected_agents():
     """Get list of connected Tendril agents."""
-    proc = subprocess.run(
-        ["curl", "-s", f"{TENDRIL_API}/api/v1/agents"],
-        capture_output=True, text=True, timeout=10
-    )
-    data = json.loads(proc.stdout)
+    data = _SESSION.get(f"{TENDRIL_API}/api/v1/agents", timeout=10).json()
     agents = data.get("agents", [])
     return [a["hostname"].lower() for a in agents
             if a.get("status") == "connected"
@@ -91,18 +97,11 @@ def get_connected_agents():
 def collect_one(hostname: str) -> tuple:
     """Collect from a single agent. Returns (hostname, data_dict or None)."""
     try:
-        proc = subprocess.run(
-            ["curl", "-s", "-X", "POST",
-             f"{TENDRIL_API}/api/v1/execute",
-             "-H", "Content-Type: application/json",
-             "-d", json.dumps({
-                 "agent": hostname,
-                 "script": COLLECT_SCRIPT,
-                 "timeout": 30
-             })],
-            capture_output=True, text=True, timeout=45
-        )
-        resp = json.loads(proc.stdout)
+        resp = _SESSION.post(f"{TENDRIL_API}/api/v1/execute", json={
+            "agent": hostname,
+            "script": COLLECT_SCRIPT,
+            "timeout": 30,
+        }, timeout=45).json()
         if resp.get("success") and resp.get("stdout"):
             data = json.loads(resp["stdout"])
             return (hostname, data)
@@ -31,8 +31,10 @@ import os
 import sys
 import time
 import base64
+import threading
 import requests
 from pathlib import Path
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 
 
@@ -46,6 +48,29 @@ FRESHSERVICE_API_KEY = os.getenv("FRESHSERVICE_API_KEY", "")
 FRESHSERVICE_DOMAIN = os.getenv("FRESHSERVICE_DOMAIN", "")
 BASE_URL = f"https://{FRESHSERVICE_DOMAIN}/api/v2"
 
+# Freshservice reports the calls left in the current per-minute window in
+# X-Ratelimit-Remaining. Once it drops to RATE_LIMIT_LOW_WATER, requests
+# (from any thread sharing the client) take turns, one every
+# RATE_LIMIT_PAUSE / (remaining + 1) seconds, so concurrent syncs slow down
+# further as the budget runs out instead of hitting 429s.
+RATE_LIMIT_LOW_WATER = 10
+RATE_LIMIT_PAUSE = 5
+
+# Serializes console output from threads sharing a client (the 429 notice
+# here, asset_sync's progress lines)
+print_lock = threading.Lock()
+
+
+def _log(*lines: str):
+    with print_lock:
+        print("\n".join(lines))
+
+# Keep-alive connections kept open to the Freshservice host. Must be at
+# least the number of threads sharing one client (asset_sync runs
+# FS_SYNC_CONCURRENCY at once); requests' default of 10 would otherwise
+# drop and reopen TLS connections under load.
+POOL_MAXSIZE = int(os.getenv("FRESHSERVICE_POOL_MAXSIZE", "16"))
+
 
 class FreshserviceClient:
     """Freshservice REST API v2 client with automatic rate-limit handling."""
@@ -76,9 +101,17 @@ class FreshserviceClient:
         self.auth = (self.api_key, "X")
         self.session = requests.Session()
         self.session.auth = self.auth
+        self.session.mount("https://", HTTPAdapter(pool_connections=1,
+                                                   pool_maxsize=POOL_MAXSIZE))
         self.session.headers.update({
             "Content-Type": "application/json",
         })
+        # Request pacing shared by all threads: the time.monotonic() slot the
+        # next request may go out at, and the spacing between slots while
+        # the rate-limit budget is low (0.0 = not throttled)
+        self._pace_lock = threading.Lock()
+        self._next_slot = 0.0
+        self._interval = 0.0
 
     # ── Core HTTP Methods ──────────────────────────────────────────────
 
@@ -87,10 +120,26 @@ class FreshserviceClient:
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
         max_retries = 3
         for attempt in range(max_retries):
+            with self._pace_lock:
+                now = time.monotonic()
+                slot = max(now, self._next_slot)
+                if self._interval:
+                    self._next_slot = slot + self._interval
+            if slot > now:
+                time.sleep(slot - now)
             resp = self.session.request(method, url, **kwargs)
+            remaining = resp.headers.get("X-Ratelimit-Remaining")
+            if remaining is not None and remaining.isdigit():
+                left = int(remaining)
+                with self._pace_lock:
+                    self._interval = (RATE_LIMIT_PAUSE / (left + 1)
+                                      if left <= RATE_LIMIT_LOW_WATER else 0.0)
             if resp.status_code == 429:
                 retry_after = int(resp.headers.get("Retry-After", 30))
-                print(f"  Rate limited. Waiting {retry_after}s...")
+                # Hold every thread off, not just this one
+                with self._pace_lock:
+                    self._next_slot = max(self._next_slot, time.monotonic() + retry_after)
+                _log(f"  Rate limited. Waiting {retry_after}s...")
                 time.sleep(retry_after)
                 continue
             return resp